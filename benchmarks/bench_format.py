@@ -0,0 +1,251 @@
+"""
+Microbenchmark for moveset formatting
+Compares the old formatter (regexes compiled and run per move on every lookup, one if-block per
+section) with formatting.format_superstar, which joins lines precomputed at load. Both run over the
+same synthetic workbook, and their output is checked to be identical first. Every moveset (and a
+note far longer than a field) is also checked to split into fields Discord accepts.
+
+Usage:
+    python benchmarks/bench_format.py --superstars 300 --repeat 20
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic_workbook import generate_workbook  # noqa: E402
+from embed_packing import FIELD_VALUE_LIMIT, split_code_aware  # noqa: E402
+from formatting import format_superstar, move_line, video_line  # noqa: E402
+from workbook import load_workbook  # noqa: E402
+
+
+def legacy_format_superstar(superstar):
+    """The formatter as it was before move colours and video links were precomputed, kept verbatim for comparison."""
+    wrestler_header = " | ".join(superstar.name_fields)
+    display_header = wrestler_header
+    if superstar.coming_soon:
+        display_header = f"{wrestler_header} — Coming Soon" if wrestler_header else "Coming Soon"
+    # Append Tier Feud Poster suffix
+    if display_header:
+        display_header = f"{display_header} Tier Feud Poster"
+
+    movesets = []
+    for moveset_number, moveset in enumerate(superstar.movesets, 1):
+        moves = moveset.moves
+
+        # Build the formatted text with modern styling
+        formatted_parts = []
+
+        # Header with emoji
+        formatted_parts.append(f"🎯 **MOVESET #{moveset_number}**")
+        formatted_parts.append(f"**{display_header}**\n")
+
+        # Moves section
+        if moves:
+            formatted_parts.append("⚡ **MOVES**")
+            formatted_parts.append("```diff")
+            import re
+            def get_move_color_emoji(move_text: str) -> str:
+                t = move_text.upper()
+                # Prefer explicit tokens with optional number suffix (e.g., BLK, BLU3, R1)
+                m = re.search(r"\b(BLK|BLU|G|Y|P|R)[0-9]?\b", t)
+                token = m.group(1) if m else None
+                if token == "BLK":
+                    return "⚫"
+                if token == "BLU":
+                    return "🔵"
+                if token == "G":
+                    return "🟢"
+                if token == "Y":
+                    return "🟡"
+                if token == "P":
+                    return "🟣"
+                if token == "R":
+                    return "🔴"
+                # Fallback to full color words or common alt-abbreviations
+                if re.search(r"\bBLACK\b", t):
+                    return "⚫"
+                if re.search(r"\bBLUE\b", t):
+                    return "🔵"
+                if re.search(r"\bGREEN\b|\bGRN\b", t):
+                    return "🟢"
+                if re.search(r"\bYELLOW\b|\bYLW\b", t):
+                    return "🟡"
+                if re.search(r"\bPURPLE\b|\bPUR\b", t):
+                    return "🟣"
+                if re.search(r"\bRED\b", t):
+                    return "🔴"
+                return "⚡"
+            for idx, move in enumerate(moves, 1):
+                move_emoji = get_move_color_emoji(move)
+                formatted_parts.append(f"+ {move_emoji} {move}")
+            formatted_parts.append("```\n")
+
+        # Trainers section
+        trainers = moveset.trainers
+        if trainers:
+            formatted_parts.append("💪 **TRAINERS**")
+            formatted_parts.append("```yaml")
+            for t in trainers:
+                formatted_parts.append(f"• {t}")
+            formatted_parts.append("```\n")
+
+        # Coaches section
+        coaches = moveset.coaches
+        if coaches:
+            formatted_parts.append("👑 **COACHES**")
+            formatted_parts.append("```yaml")
+            for c in coaches:
+                formatted_parts.append(f"• {c}")
+            formatted_parts.append("```\n")
+
+        # Skill Plates
+        if moveset.skill_plates:
+            formatted_parts.append("⭐ **SKILL PLATES**")
+            formatted_parts.append("```yaml")
+            for p in moveset.skill_plates:
+                formatted_parts.append(f"• {p}")
+            formatted_parts.append("```\n")
+
+        # Ultimate Plates
+        if moveset.ultimate_plates:
+            formatted_parts.append("✨ **ULTIMATE PLATES**")
+            formatted_parts.append("```yaml")
+            for p in moveset.ultimate_plates:
+                formatted_parts.append(f"• {p}")
+            formatted_parts.append("```\n")
+
+        # Gear & Moments
+        if moveset.gear:
+            formatted_parts.append("🎒 **GEAR & MOMENTS**")
+            formatted_parts.append("```yaml")
+            for g in moveset.gear:
+                formatted_parts.append(f"• {g}")
+            formatted_parts.append("```\n")
+
+        # Tag Links
+        if moveset.tag_links:
+            formatted_parts.append("🤝 **TAG LINKS**")
+            formatted_parts.append("```yaml")
+            for t in moveset.tag_links:
+                formatted_parts.append(f"• {t}")
+            formatted_parts.append("```\n")
+
+        # Entourage Ability
+        if moveset.entourage:
+            formatted_parts.append("👥 **ENTOURAGE**")
+            formatted_parts.append("```yaml")
+            for e in moveset.entourage:
+                formatted_parts.append(f"• {e}")
+            formatted_parts.append("```\n")
+
+        # Notes
+        if moveset.notes:
+            formatted_parts.append("📝 **NOTES**")
+            formatted_parts.append("```")
+            for n in moveset.notes:
+                formatted_parts.append(f"• {n}")
+            formatted_parts.append("```\n")
+
+        # Gameplay Videos
+        if moveset.videos:
+            formatted_parts.append("🎬 **GAMEPLAY VIDEOS**")
+            for v in moveset.videos:
+                # Make sure the URL is clickable - format as Discord hyperlink
+                v_stripped = v.strip()
+                if v_stripped.startswith(("http://", "https://")):
+                    # Full URL - make it clickable
+                    formatted_parts.append(f"🔗 [Watch Video]({v_stripped})")
+                elif v_stripped.startswith("www."):
+                    # URL without protocol - add https
+                    url = f"https://{v_stripped}"
+                    formatted_parts.append(f"🔗 [Watch Video]({url})")
+                elif "youtube.com" in v_stripped.lower() or "youtu.be" in v_stripped.lower():
+                    # YouTube link without protocol
+                    url = v_stripped if v_stripped.startswith("http") else f"https://{v_stripped}"
+                    formatted_parts.append(f"🔗 [Watch Video]({url})")
+                else:
+                    # Not a recognizable URL format - display as-is
+                    formatted_parts.append(f"🔗 {v_stripped}")
+            formatted_parts.append("")  # Empty line for spacing
+
+        movesets.append("\n".join(formatted_parts))
+
+    return movesets
+
+
+def precompute(superstars):
+    """What parse_moveset now does once per cell at load."""
+    for superstar in superstars:
+        for moveset in superstar.movesets:
+            [move_line(move) for move in moveset.moves]
+            [video_line(video) for video in moveset.videos]
+
+
+def oversized_fields(texts):
+    """Field chunks over Discord's 1024 characters when texts are split for embeds, as (text number, length)."""
+    return [
+        (number, len(chunk))
+        for number, text in enumerate(texts)
+        for chunk in split_code_aware(text, FIELD_VALUE_LIMIT)
+        if len(chunk) > FIELD_VALUE_LIMIT
+    ]
+
+
+def best_of(func, superstars, repeat):
+    """Fastest of `repeat` passes over every superstar, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(superstars)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--superstars", type=int, default=300)
+    parser.add_argument("--sheets", type=int, default=6)
+    parser.add_argument("--max-movesets", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="format-bench-"), "bench.xlsx")
+    generate_workbook(path, args.superstars, args.sheets, args.max_movesets, seed=args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        superstars = load_workbook(path, use_snapshot=False).superstars
+    movesets = sum(len(superstar.movesets) for superstar in superstars)
+
+    for superstar in superstars:
+        if legacy_format_superstar(superstar) != format_superstar(superstar):
+            print(f"❌ Output differs for {superstar.full_name}")
+            sys.exit(1)
+    # A single cell longer than a field is the case most likely to overflow one
+    long_note = "🎯 **MOVESET #1**\n\n📝 **NOTES**\n```\n• " + "x" * 1500 + "\n```"
+    oversized = oversized_fields([text for superstar in superstars for text in format_superstar(superstar)] + [long_note])
+    if oversized:
+        print(f"❌ Fields over {FIELD_VALUE_LIMIT} characters: {oversized[:5]}")
+        sys.exit(1)
+
+    before = best_of(lambda items: [legacy_format_superstar(s) for s in items], superstars, args.repeat)
+    after = best_of(lambda items: [format_superstar(s) for s in items], superstars, args.repeat)
+    load = best_of(precompute, superstars, args.repeat)
+
+    print(f"📊 {len(superstars)} superstars, {movesets} movesets, best of {args.repeat}")
+    print(f"{'':<22}{'total ms':>10}{'µs/moveset':>12}")
+    print(f"{'before (per lookup)':<22}{before * 1000:>10.2f}{before / movesets * 1e6:>12.2f}")
+    print(f"{'after (per lookup)':<22}{after * 1000:>10.2f}{after / movesets * 1e6:>12.2f}")
+    print(f"{'precompute (at load)':<22}{load * 1000:>10.2f}{load / movesets * 1e6:>12.2f}")
+    print(f"⚡ {before / after:.1f}x faster per lookup, identical output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Offline benchmark for the !lookup pipeline
+Generates a synthetic workbook, imports bot.py against it (no Discord connection needed) and
+times each stage: workbook load, index search, moveset formatting, rendering a first page, the full
+lookup command with a cold and a warm result cache, and picking from its selection menu. Reports
+p50/p95/p99 latency, throughput and peak traced memory per stage, and saves everything as JSON so
+two runs can be compared.
+
+Usage:
+    python benchmarks/bench_lookup.py --superstars 500 --label my-change
+    python benchmarks/bench_lookup.py --compare benchmarks/results/before.json benchmarks/results/after.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+sys.path.insert(0, REPO_ROOT)
+
+from formatting import format_superstar  # noqa: E402
+from synthetic_workbook import generate_workbook  # noqa: E402
+
+
+class FakeMessage:
+    id = 0
+
+
+class FakeAuthor:
+    id = 1
+
+
+class FakeContext:
+    """Just enough of commands.Context for lookup: records what would have been sent."""
+
+    author = FakeAuthor()
+
+    def __init__(self):
+        self.sent = []
+
+    async def defer(self):
+        pass
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append((content, kwargs))
+        return FakeMessage()
+
+
+def build_queries(names, count, seed):
+    """Mix of what users actually type: full names, single words, typos and misses."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(name)
+        elif kind < 0.7:
+            queries.append(rng.choice(name.split()))
+        elif kind < 0.9:
+            i = rng.randrange(1, len(name) - 1)
+            queries.append(name[:i] + name[i + 1:])  # dropped letter
+        else:
+            queries.append(f"nobody {rng.randint(1, 10**6)}")
+    return queries
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def summarize(durations, peak_bytes):
+    durations = sorted(durations)
+    total = sum(durations)
+    return {
+        "runs": len(durations),
+        "p50_ms": percentile(durations, 50) * 1000,
+        "p95_ms": percentile(durations, 95) * 1000,
+        "p99_ms": percentile(durations, 99) * 1000,
+        "mean_ms": total / len(durations) * 1000 if durations else 0.0,
+        "throughput_per_s": len(durations) / total if total else 0.0,
+        "peak_kib": peak_bytes / 1024,
+    }
+
+
+def measure(func, items):
+    """Time func(item) for every item, then run it again under tracemalloc for the peak allocation."""
+    durations = []
+    for item in items:
+        started = time.perf_counter()
+        func(item)
+        durations.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    for item in items:
+        func(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return summarize(durations, peak)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args):
+    workdir = tempfile.mkdtemp(prefix="lookup-bench-")
+    path = os.path.join(workdir, "bench.xlsx")
+    names = generate_workbook(path, args.superstars, args.sheets, args.max_movesets, seed=args.seed)
+    queries = build_queries(names, args.queries, args.seed)
+
+    os.environ["EXCEL_FILE"] = path
+    os.environ["WORKBOOK_WATCH_INTERVAL"] = "0"
+    quiet = io.StringIO()
+    with contextlib.redirect_stdout(quiet):
+        import bot
+        import lookup_jobs
+        import workbook as workbook_module
+    bot.selection_store.path = None  # don't write menu or page state during the benchmark
+    bot.page_store.path = None
+
+    stages = {}
+    with contextlib.redirect_stdout(quiet):
+        stages["load_xlsx"] = measure(
+            lambda _: workbook_module.load_workbook(path, use_snapshot=False, loader="pandas"), range(args.load_runs)
+        )
+        stages["load_stream"] = measure(
+            lambda _: workbook_module.load_workbook(path, use_snapshot=False, loader="stream"), range(args.load_runs)
+        )
+        workbook_module.write_snapshot(path, bot.workbook)
+        version = bot.workbook.version
+        stages["load_snapshot"] = measure(lambda _: workbook_module.read_snapshot(path, version), range(args.load_runs))
+
+        wb = bot.workbook
+        stages["search"] = measure(wb.search, queries)
+        matches = {query: wb.search(query) for query in queries}
+        stages["format"] = measure(lambda q: [format_superstar(s) for s in matches[q]], queries)
+        found = {}
+        for query in queries:
+            tier_list_entries, choices, _ = lookup_jobs.find_superstars(wb, query)
+            found[query] = ([p for positions in choices.values() for p in positions], bool(tier_list_entries))
+        # Formatting and packing the first page of everything a query matched, which is all a lookup sends
+        stages["first_page"] = measure(lambda q: lookup_jobs.render_page(wb, lookup_jobs.result_header(q), *found[q], 1, 0), queries)
+
+        loop = asyncio.new_event_loop()
+
+        def run_lookup(query):
+            loop.run_until_complete(bot.lookup.callback(FakeContext(), name=query))
+
+        def run_cold_lookup(query):
+            bot.lookup_cache.clear()
+            run_lookup(query)
+
+        stages["lookup_cold"] = measure(run_cold_lookup, queries)
+        for query in queries:
+            run_lookup(query)  # warm the cache
+        stages["lookup_warm"] = measure(run_lookup, queries)
+
+        # Ambiguous lookups only send a menu; picking its first option renders the builds
+        picks = []
+        for query in queries:
+            result = loop.run_until_complete(bot.get_lookup_result(wb, query))
+            if result["page"] is None and result["choices"]:
+                picks.append(["pick", query, result["choices"][0][0]])
+
+        def run_cold_pick(source):
+            bot.lookup_cache.clear()
+            loop.run_until_complete(bot.get_page(wb, source))
+
+        if picks:
+            stages["pick_cold"] = measure(run_cold_pick, picks)
+        loop.close()
+
+    return {
+        "label": args.label,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "params": {
+            "superstars": args.superstars,
+            "sheets": args.sheets,
+            "max_movesets": args.max_movesets,
+            "queries": args.queries,
+            "load_runs": args.load_runs,
+            "seed": args.seed,
+            "parsed_superstars": len(bot.workbook.superstars),
+        },
+        "stages": stages,
+    }
+
+
+def print_report(result):
+    print(f"📊 {result['label']} @ {result['git_commit'] or 'unknown commit'} — {result['params']}")
+    print(f"{'stage':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>12}{'peak KiB':>12}")
+    for stage, stats in result["stages"].items():
+        print(
+            f"{stage:<14}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+            f"{stats['throughput_per_s']:>12.1f}{stats['peak_kib']:>12.1f}"
+        )
+
+
+def compare(old_path, new_path, threshold):
+    """Print per-stage changes between two saved runs. Returns True if any stage's p95 regressed past threshold."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    if old["params"] != new["params"]:
+        print("⚠️ The runs used different parameters, numbers may not be comparable")
+
+    regressed = False
+    print(f"{'stage':<14}{'p95 before':>12}{'p95 after':>12}{'change':>10}{'peak KiB':>20}")
+    for stage, after in new["stages"].items():
+        before = old["stages"].get(stage)
+        if before is None:
+            print(f"{stage:<14}{'—':>12}{after['p95_ms']:>12.3f}{'new':>10}")
+            continue
+        change = (after["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  ⚠️ regression"
+            regressed = True
+        memory = f"{before['peak_kib']:.0f} → {after['peak_kib']:.0f}"
+        print(f"{stage:<14}{before['p95_ms']:>12.3f}{after['p95_ms']:>12.3f}{change:>9.1f}%{memory:>20}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--superstars", type=int, default=300)
+    parser.add_argument("--sheets", type=int, default=6)
+    parser.add_argument("--max-movesets", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--load-runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default="local")
+    parser.add_argument("--output", help="where to save the JSON results (default: benchmarks/results/<label>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two saved result files")
+    parser.add_argument("--threshold", type=float, default=10.0, help="p95 increase (%%) counted as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    result = run_benchmark(args)
+    print_report(result)
+    output = args.output or os.path.join(RESULTS_DIR, f"{args.label}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"💾 Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,515 @@
+"""
+End-to-end load test for bot.py against a local stand-in for Discord
+Starts a fake Discord API (REST + gateway) on localhost, points discord.py at it and runs the real
+bot against a synthetic workbook, so no network or token is needed. The fake gateway injects
+MESSAGE_CREATE events with !lookup commands at a steady rate and picks from the selection menus
+the bot sends; the fake REST API answers with configurable latency, per-channel and global rate
+limits (the same headers and 429s Discord sends) and optional extra 429s.
+
+Reports, per command: time to the first reply and to the last one, time from a menu pick to its
+results, throughput, how often the bot was rate limited, and event-loop lag inside the bot. Results
+are saved as JSON in the same shape as bench_lookup.py, so its --compare works on them.
+
+Usage:
+    python benchmarks/load_test.py --commands 300 --rate 20 --label baseline
+    python benchmarks/load_test.py --latency-ms 120 --rate-limit-chance 0.05 --label slow-api
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from aiohttp import WSMsgType, web
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_lookup import RESULTS_DIR, build_queries, git_commit, print_report, summarize  # noqa: E402
+from synthetic_workbook import generate_workbook  # noqa: E402
+
+DISCORD_EPOCH_MS = 1420070400000
+APP_ID = 100000000000000001
+BOT_USER = {"id": str(APP_ID), "username": "LoadTestBot", "discriminator": "0000", "global_name": None, "avatar": None, "bot": True}
+OWNER = {"id": "100000000000000002", "username": "owner", "discriminator": "0", "global_name": None, "avatar": None}
+MEMBER = {"id": "100000000000000003", "username": "officer", "discriminator": "0", "global_name": None, "avatar": None}
+FIRST_CHANNEL = 200000000000000000
+LAG_INTERVAL = 0.05  # seconds between event-loop lag samples
+
+
+@dataclass
+class CommandRecord:
+    query: str
+    injected_at: float
+    replies: list = field(default_factory=list)  # arrival times of the bot's messages
+    outcome: str = ""
+    pick_injected_at: float = None
+    pick_replies: list = field(default_factory=list)  # interaction response + followups
+
+
+class FakeDiscord:
+    """Just enough of Discord's REST API and gateway for bot.py's lookups, running in its own thread and loop."""
+
+    def __init__(self, args, queries):
+        self.args = args
+        self.queries = queries
+        self.rng = random.Random(args.seed)
+        self.records = {}  # channel id -> CommandRecord
+        self.picks = {}  # interaction token -> channel id
+        self.buckets = {}  # bucket -> [reset at, remaining]
+        self.counts = {"requests": 0, "rate_limited": 0, "global_rate_limited": 0, "injected_429": 0}
+        self.unknown_routes = {}
+        self.finished = concurrent.futures.Future()
+        self.started = threading.Event()
+        self.port = None
+        self.loop = None
+        self._ids = itertools.count()
+        self._sequence = itertools.count(1)
+        self._last_activity = 0.0
+        self._pending = set()
+
+    # Plumbing
+
+    def snowflake(self):
+        return ((int(time.time() * 1000) - DISCORD_EPOCH_MS) << 22) | (next(self._ids) % (1 << 22))
+
+    def now(self):
+        return self.loop.time()
+
+    def start(self):
+        threading.Thread(target=self._run, name="fake-discord", daemon=True).start()
+        self.started.wait()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        app = web.Application()
+        api = "/api/v10"
+        app.router.add_get(f"{api}/users/@me", self.current_user)
+        app.router.add_get(f"{api}/oauth2/applications/@me", self.application)
+        app.router.add_get(f"{api}/gateway", self.gateway_url)
+        app.router.add_get(f"{api}/gateway/bot", self.gateway_url)
+        app.router.add_post(f"{api}/channels/{{channel_id}}/messages", self.create_message)
+        app.router.add_post(f"{api}/interactions/{{interaction_id}}/{{token}}/callback", self.interaction_callback)
+        app.router.add_post(f"{api}/webhooks/{{application_id}}/{{token}}", self.followup)
+        app.router.add_get("/gateway", self.gateway)
+        app.router.add_route("*", "/{tail:.*}", self.unknown)
+        runner = web.AppRunner(app)
+        self.loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self.started.set()
+        self.loop.run_forever()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def respond(self, payload, status=200, headers=None):
+        latency = self.args.latency_ms / 1000 * (1 + self.rng.uniform(-self.args.jitter, self.args.jitter))
+        await asyncio.sleep(max(latency, 0))
+        return json_response(payload, status, headers)
+
+    def rate_limit(self, bucket):
+        """Take one request from bucket and the global limit. Returns (headers, 429 response or None)."""
+        self.counts["requests"] += 1
+        now = time.time()
+        window = self.buckets.get("global")
+        if window is None or now >= window[0]:
+            window = self.buckets["global"] = [now + 1, self.args.global_limit]
+        if window[1] <= 0:
+            self.counts["global_rate_limited"] += 1
+            retry_after = window[0] - now
+            payload = {"message": "You are being rate limited.", "retry_after": retry_after, "global": True}
+            return {}, json_response(payload, 429, {
+                "Retry-After": f"{retry_after:.3f}", "X-RateLimit-Global": "true", "X-RateLimit-Scope": "global",
+                "Via": "1.1 google",  # discord.py treats a 429 without it as a Cloudflare ban and gives up
+            })
+        window[1] -= 1
+
+        window = self.buckets.get(bucket)
+        if window is None or now >= window[0]:
+            window = self.buckets[bucket] = [now + self.args.bucket_window, self.args.bucket_limit]
+        injected = window[1] > 0 and self.rng.random() < self.args.rate_limit_chance
+        if window[1] <= 0 or injected:
+            self.counts["injected_429" if injected else "rate_limited"] += 1
+            retry_after = self.rng.uniform(0.1, 1.0) if injected else window[0] - now
+            payload = {"message": "You are being rate limited.", "retry_after": retry_after, "global": False}
+            return {}, json_response(payload, 429, {
+                "Retry-After": f"{retry_after:.3f}",
+                "X-RateLimit-Limit": str(self.args.bucket_limit),
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": f"{now + retry_after:.3f}",
+                "X-RateLimit-Reset-After": f"{retry_after:.3f}",
+                "X-RateLimit-Bucket": bucket,
+                "X-RateLimit-Scope": "user",
+                "Via": "1.1 google",
+            })
+        window[1] -= 1
+        return {
+            "X-RateLimit-Limit": str(self.args.bucket_limit),
+            "X-RateLimit-Remaining": str(window[1]),
+            "X-RateLimit-Reset": f"{window[0]:.3f}",
+            "X-RateLimit-Reset-After": f"{window[0] - now:.3f}",
+            "X-RateLimit-Bucket": bucket,
+        }, None
+
+    def message_payload(self, channel_id, body, author=BOT_USER):
+        return {
+            "id": str(self.snowflake()),
+            "channel_id": str(channel_id),
+            "author": author,
+            "content": body.get("content") or "",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": body.get("embeds") or [],
+            "components": body.get("components") or [],
+            "pinned": False,
+            "type": 0,
+            "flags": body.get("flags") or 0,
+        }
+
+    # REST
+
+    async def current_user(self, request):
+        return await self.respond(BOT_USER)
+
+    async def application(self, request):
+        return await self.respond({
+            "id": str(APP_ID), "name": "LoadTestBot", "description": "", "icon": None, "bot_public": True,
+            "bot_require_code_grant": False, "owner": OWNER, "verify_key": "0" * 64, "flags": 0, "team": None,
+        })
+
+    async def gateway_url(self, request):
+        return await self.respond({
+            "url": f"ws://127.0.0.1:{self.port}/gateway",
+            "shards": 1,
+            "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 1},
+        })
+
+    async def create_message(self, request):
+        channel_id = int(request.match_info["channel_id"])
+        headers, limited = self.rate_limit(f"channel-{channel_id}")
+        if limited is not None:
+            return limited
+        body = await request.json()
+        record = self.records.get(channel_id)
+        if record is not None:
+            record.replies.append(self.now())
+            self._last_activity = self.now()
+            if not record.outcome:
+                record.outcome = classify(body)
+        payload = self.message_payload(channel_id, body)
+        if record is not None and record.outcome == "menu" and self.rng.random() < self.args.pick_chance:
+            self.schedule(self.pick(channel_id, payload))
+        return await self.respond(payload, headers=headers)
+
+    async def interaction_callback(self, request):
+        token = request.match_info["token"]
+        body = await request.json()
+        channel_id = self.picks.get(token)
+        if channel_id is not None:
+            self.records[channel_id].pick_replies.append(self.now())
+            self._last_activity = self.now()
+        data = body.get("data") or {}
+        message = self.message_payload(channel_id or 0, data)
+        return await self.respond({
+            "interaction": {"id": request.match_info["interaction_id"], "type": 3, "response_message_id": message["id"]},
+            "resource": {"type": body.get("type", 4), "message": message},
+        })
+
+    async def followup(self, request):
+        token = request.match_info["token"]
+        headers, limited = self.rate_limit(f"webhook-{token}")
+        if limited is not None:
+            return limited
+        body = await request.json()
+        channel_id = self.picks.get(token)
+        if channel_id is not None:
+            self.records[channel_id].pick_replies.append(self.now())
+            self._last_activity = self.now()
+        return await self.respond(self.message_payload(channel_id or 0, body), headers=headers)
+
+    async def unknown(self, request):
+        route = f"{request.method} {request.path}"
+        self.unknown_routes[route] = self.unknown_routes.get(route, 0) + 1
+        return await self.respond({"message": "Unknown route in the load test stand-in", "code": 0}, status=404)
+
+    # Gateway
+
+    async def gateway(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.ws = ws
+        await ws.send_json({"op": 10, "d": {"heartbeat_interval": 41250}, "s": None, "t": None})
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            payload = json.loads(message.data)
+            if payload["op"] == 1:
+                await ws.send_json({"op": 11, "d": None, "s": None, "t": None})
+            elif payload["op"] == 2:
+                await self.dispatch("READY", {
+                    "v": 10,
+                    "user": BOT_USER,
+                    "guilds": [],
+                    "session_id": "load-test",
+                    "resume_gateway_url": f"ws://127.0.0.1:{self.port}/gateway",
+                    "application": {"id": str(APP_ID), "flags": 0},
+                    "private_channels": [],
+                })
+                self.schedule(self.inject())
+        return ws
+
+    async def dispatch(self, event, data):
+        await self.ws.send_json({"op": 0, "t": event, "s": next(self._sequence), "d": data})
+
+    def schedule(self, coro):
+        task = self.loop.create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def inject(self):
+        """Send one !lookup every 1/rate seconds, open loop, then wait for the replies to settle."""
+        started = self.now()
+        for i, query in enumerate(self.queries):
+            await asyncio.sleep(max(0, started + i / self.args.rate - self.now()))
+            channel_id = FIRST_CHANNEL + i
+            self.records[channel_id] = CommandRecord(query, self.now())
+            await self.dispatch("MESSAGE_CREATE", self.message_payload(
+                channel_id, {"content": f"{self.args.command} {query}"}, author=MEMBER,
+            ))
+        injected_at = self.now()
+
+        while self.now() - injected_at < self.args.timeout:
+            await asyncio.sleep(0.1)
+            waiting = any(
+                not record.replies or (record.pick_injected_at is not None and len(record.pick_replies) < 2)
+                for record in self.records.values()
+            )
+            if not waiting and not self._pending - {asyncio.current_task()} and self.now() - self._last_activity >= self.args.drain_ms / 1000:
+                break
+        self.finished.set_result(None)
+
+    async def pick(self, channel_id, message):
+        """Pick the first option of a selection menu after the user's think time."""
+        await asyncio.sleep(self.args.think_ms / 1000)
+        select = message["components"][0]["components"][0]
+        token = f"pick-{channel_id}"
+        self.picks[token] = channel_id
+        self.records[channel_id].pick_injected_at = self.now()
+        await self.dispatch("INTERACTION_CREATE", {
+            "id": str(self.snowflake()),
+            "application_id": str(APP_ID),
+            "type": 3,
+            "token": token,
+            "version": 1,
+            "channel_id": str(channel_id),
+            "channel": {"id": str(channel_id), "type": 1},
+            "user": MEMBER,
+            "message": message,
+            "data": {"custom_id": select["custom_id"], "component_type": 3, "values": [select["options"][0]["value"]]},
+            "locale": "en-US",
+            "app_permissions": "0",
+            "attachment_size_limit": 10 << 20,
+            "entitlements": [],
+            "context": 1,
+            "authorizing_integration_owners": {"1": MEMBER["id"]},
+        })
+
+
+def json_response(payload, status=200, headers=None):
+    # discord.py only parses bodies whose content type is exactly "application/json" (no charset)
+    return web.Response(body=json.dumps(payload).encode(), status=status, headers={**(headers or {}), "Content-Type": "application/json"})
+
+
+def classify(body):
+    """What the bot's first reply to a command was."""
+    if any(component.get("custom_id", "").startswith("lookup-pick:")
+           for row in body.get("components") or [] for component in row.get("components", [])):
+        return "menu"
+    if body.get("embeds"):
+        return "results"
+    content = body.get("content") or ""
+    if content.startswith("⏳"):
+        return "busy"
+    if content.startswith("❌"):
+        return "not_found"
+    return "other"
+
+
+class ErrorLog(logging.Handler):
+    """Collects what discord.py logs at ERROR (failed commands, views and event handlers) instead of printing it."""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.errors = {}
+
+    def emit(self, record):
+        error = record.exc_info[1] if record.exc_info else None
+        key = f"{type(error).__name__}: {error}" if error else record.getMessage()
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+
+async def drive_bot(bot_module, server):
+    """Run the bot until the fake server has seen every command through, sampling event-loop lag."""
+    import discord
+    import yarl
+
+    discord.http.Route.BASE = f"http://127.0.0.1:{server.port}/api/v10"
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f"ws://127.0.0.1:{server.port}/gateway")
+
+    loop = asyncio.get_running_loop()
+    lag = []
+
+    async def monitor():
+        while True:
+            started = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            lag.append(max(0.0, loop.time() - started - LAG_INTERVAL))
+
+    client = bot_module.bot
+
+    @client.listen("on_command_error")
+    async def log_command_error(ctx, error):
+        logging.getLogger("discord").error("command failed", exc_info=(type(error), error, error.__traceback__))
+
+    runner = loop.create_task(client.start("load-test-token"))
+    monitor_task = loop.create_task(monitor())
+    try:
+        done, _ = await asyncio.wait({runner, asyncio.wrap_future(server.finished)}, return_when=asyncio.FIRST_COMPLETED)
+        if runner in done:
+            runner.result()  # the bot stopped on its own: raise why
+    finally:
+        monitor_task.cancel()
+        await client.close()
+    await runner
+    return lag
+
+
+def run_load_test(args):
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    path = os.path.join(workdir, "load.xlsx")
+    names = generate_workbook(path, args.superstars, args.sheets, args.max_movesets, seed=args.seed)
+    queries = build_queries(names, args.commands, args.seed)
+
+    os.environ["EXCEL_FILE"] = path
+    os.environ["WORKBOOK_WATCH_INTERVAL"] = "0"
+    os.environ["METRICS_INTERVAL"] = "0"
+    os.environ["SELECTION_STATE_FILE"] = os.path.join(workdir, "selection_state.json")
+    os.environ["PAGE_STATE_FILE"] = os.path.join(workdir, "page_state.json")
+    os.environ["PROFILE_DIR"] = os.path.join(workdir, "profiles")
+    server = FakeDiscord(args, queries)
+    server.start()
+
+    error_log = ErrorLog()
+    logging.getLogger("discord").addHandler(error_log)
+    bot_output = io.StringIO()
+    with contextlib.redirect_stdout(bot_output):
+        import bot
+        started = time.perf_counter()
+        lag = asyncio.run(drive_bot(bot, server))
+        elapsed = time.perf_counter() - started
+    server.stop()
+
+    records = list(server.records.values())
+    complete = [record for record in records if record.replies]
+    first = [record.replies[0] - record.injected_at for record in complete]
+    last = [record.replies[-1] - record.injected_at for record in complete]
+    picks = [
+        record.pick_replies[-1] - record.pick_injected_at
+        for record in complete if record.pick_injected_at is not None and len(record.pick_replies) > 1
+    ]
+    outcomes = {}
+    for record in records:
+        outcomes[record.outcome or "no_reply"] = outcomes.get(record.outcome or "no_reply", 0) + 1
+    span = max(record.replies[-1] for record in complete) - min(record.injected_at for record in records) if complete else 0
+
+    stages = {"reply_first": summarize(first, 0), "reply_last": summarize(last, 0), "loop_lag": summarize(lag, 0)}
+    if picks:
+        stages["pick"] = summarize(picks, 0)
+    return {
+        "label": args.label,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "params": {
+            "superstars": args.superstars,
+            "commands": args.commands,
+            "rate": args.rate,
+            "latency_ms": args.latency_ms,
+            "bucket_limit": args.bucket_limit,
+            "bucket_window": args.bucket_window,
+            "global_limit": args.global_limit,
+            "rate_limit_chance": args.rate_limit_chance,
+            "pick_chance": args.pick_chance,
+            "seed": args.seed,
+        },
+        "stages": stages,
+        "commands_per_s": len(complete) / span if span else 0.0,
+        "elapsed_s": elapsed,
+        "outcomes": outcomes,
+        "http": dict(server.counts),
+        "unknown_routes": server.unknown_routes,
+        "errors": error_log.errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--superstars", type=int, default=300)
+    parser.add_argument("--sheets", type=int, default=6)
+    parser.add_argument("--max-movesets", type=int, default=3)
+    parser.add_argument("--commands", type=int, default=200, help="how many commands to inject")
+    parser.add_argument("--command", default="!lookup", help="command each injected message runs, e.g. !lookupmany")
+    parser.add_argument("--rate", type=float, default=20.0, help="commands injected per second")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="REST response latency")
+    parser.add_argument("--jitter", type=float, default=0.3, help="± fraction of latency added at random")
+    parser.add_argument("--bucket-limit", type=int, default=5, help="requests per channel per window (Discord: 5)")
+    parser.add_argument("--bucket-window", type=float, default=5.0, help="seconds")
+    parser.add_argument("--global-limit", type=int, default=50, help="requests per second across all routes (Discord: 50)")
+    parser.add_argument("--rate-limit-chance", type=float, default=0.0, help="extra chance of a 429 on any request")
+    parser.add_argument("--pick-chance", type=float, default=1.0, help="chance the user picks from a selection menu")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="how long the user takes to pick")
+    parser.add_argument("--drain-ms", type=float, default=1000.0, help="quiet time that counts as all replies sent")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for replies after the last command")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default="load")
+    parser.add_argument("--output", help="where to save the JSON results (default: benchmarks/results/<label>.json)")
+    args = parser.parse_args()
+
+    result = run_load_test(args)
+    print_report(result)
+    print(f"🚀 {result['commands_per_s']:.1f} commands/s completed, outcomes {result['outcomes']}")
+    print(f"🌐 HTTP {result['http']}")
+    for error, count in result["errors"].items():
+        print(f"❌ {count}× {error}")
+    if result["unknown_routes"]:
+        print(f"⚠️ Routes the stand-in doesn't implement: {result['unknown_routes']}")
+    output = args.output or os.path.join(RESULTS_DIR, f"{args.label}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"💾 Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Synthetic workbook generator for the benchmarks
+Builds an .xlsx laid out the way bot.py expects: one sheet per class with a header row,
+3-row movesets, merged name cells, Trainer/Coach/Plates columns, and a Tier List sheet
+whose row 7 holds the "Coming Soon" roster.
+
+Usage:
+    python benchmarks/synthetic_workbook.py out.xlsx --superstars 200 --sheets 6
+"""
+
+import argparse
+import random
+
+from openpyxl import Workbook
+
+HEADERS = [
+    "Wrestler", "Era", "Class", "Moves",
+    "Trainer 1", "Trainer 2", "Coach 1", "Coach 2",
+    "Skill Plates", "Ultimate Plates", "Gear & Moments", "Tag Links",
+    "Entourage Ability", "Notes", "Gameplay Videos",
+]
+CLASS_SHEETS = [
+    ("Strikers", "Striker"), ("Acros", "Acrobat"), ("Techs", "Technician"),
+    ("Tricksters", "Trickster"), ("PHs", "Powerhouse"), ("SBs", "Showboat"),
+]
+ERAS = ["Attitude", "Ruthless Aggression", "PG", "Modern", "New Generation", "Golden"]
+FIRST_NAMES = [
+    "The", "Rhea", "John", "Becky", "Roman", "Rey", "Bianca", "Seth", "Charlotte", "Randy",
+    "Cody", "Liv", "Drew", "Asuka", "Kofi", "Bayley", "Finn", "Sasha", "Edge", "Trish",
+]
+LAST_NAMES = [
+    "Undertaker", "Ripley", "Cena", "Lynch", "Reigns", "Mysterio", "Belair", "Rollins", "Flair", "Orton",
+    "Rhodes", "Morgan", "McIntyre", "Balor", "Kingston", "Banks", "Stratus", "Lita", "Styles", "Owens",
+]
+MOVE_COLOURS = ["BLK", "BLU", "G", "Y", "P", "R", "Black", "Blue", "Green", "Yellow", "Purple", "Red"]
+
+
+def superstar_names(count, rng):
+    """Distinct, realistic-looking names; numbered once the first/last combinations run out."""
+    names = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+    rng.shuffle(names)
+    return [names[i % len(names)] + (f" {i // len(names) + 1}" if i >= len(names) else "") for i in range(count)]
+
+
+def moveset_rows(rng):
+    """Cells (from the Moves column on) for one 3-row moveset."""
+    rows = []
+    for row_in_set in range(3):
+        colour = rng.choice(MOVE_COLOURS)
+        suffix = rng.choice(["", "1", "2", "3"]) if len(colour) <= 3 else ""
+        rows.append([
+            f"Move {rng.randint(1, 400)} {colour}{suffix}",
+            f"Trainer {rng.randint(1, 60)}" if row_in_set == 0 else None,
+            f"Trainer {rng.randint(1, 60)}" if row_in_set == 0 else None,
+            f"Coach {rng.randint(1, 30)}" if row_in_set == 0 else None,
+            f"Coach {rng.randint(1, 30)}" if row_in_set == 0 and rng.random() < 0.5 else None,
+            f"Skill Plate {rng.randint(1, 80)}",
+            f"Ultimate Plate {rng.randint(1, 20)}" if row_in_set == 0 else None,
+            f"Gear {rng.randint(1, 50)} & Moment {rng.randint(1, 50)}" if row_in_set < 2 else None,
+            f"Tag Link {rng.randint(1, 40)}" if row_in_set == 1 else None,
+            f"Entourage {rng.randint(1, 25)}" if row_in_set == 2 else None,
+            "Use the second ultimate first" if row_in_set == 0 and rng.random() < 0.3 else None,
+            rng.choice(["https://youtu.be/abc123", "www.youtube.com/watch?v=xyz", "youtu.be/q9", None]) if row_in_set == 0 else None,
+        ])
+    return rows
+
+
+def generate_workbook(path, superstars=200, sheets=6, max_movesets=3, coming_soon=12, seed=1):
+    """Write a synthetic workbook to path with `superstars` builds spread over `sheets` class sheets."""
+    rng = random.Random(seed)
+    wb = Workbook()
+    wb.remove(wb.active)
+    names = superstar_names(superstars, rng)
+
+    class_sheets = CLASS_SHEETS[:max(1, min(sheets, len(CLASS_SHEETS)))]
+    for sheet_idx, (sheet_name, class_name) in enumerate(class_sheets):
+        ws = wb.create_sheet(sheet_name)
+        ws.append(HEADERS)
+        for name in names[sheet_idx::len(class_sheets)]:
+            start_row = ws.max_row + 1
+            era = rng.choice(ERAS)
+            rows = [cells for _ in range(rng.randint(1, max_movesets)) for cells in moveset_rows(rng)]
+            for i, cells in enumerate(rows):
+                name_cells = [name, era, class_name] if i == 0 else [None, None, None]
+                ws.append(name_cells + cells)
+            # Name, Era and Class are merged down the whole block in the real workbook
+            for col in range(1, 4):
+                ws.merge_cells(start_row=start_row, end_row=ws.max_row, start_column=col, end_column=col)
+
+    ws = wb.create_sheet("Tier List")
+    for i in range(6):
+        ws.append([f"Tier List header row {i + 1}"])
+    upcoming = rng.sample(names, min(coming_soon, len(names)))
+    ws.append(["Coming Soon", "Brought to you by the Twilight BATs"] + [", ".join(upcoming[i:i + 3]) for i in range(0, len(upcoming), 3)])
+
+    wb.save(path)
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--superstars", type=int, default=200)
+    parser.add_argument("--sheets", type=int, default=6)
+    parser.add_argument("--max-movesets", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    generate_workbook(args.path, args.superstars, args.sheets, args.max_movesets, seed=args.seed)
+    print(f"✅ Wrote {args.path}")
+
+
+if __name__ == "__main__":
+    main()
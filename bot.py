@@ -1,583 +1,945 @@
 import discord
-from discord.ext import commands
-import pandas as pd
+from discord import app_commands
+from discord.ext import commands, tasks
 import os
 import asyncio
+import functools
+import gc
+import importlib.machinery
+import math
+import multiprocessing
+import secrets
+import signal
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from caching import LRUCache, SingleFlight, TTLStore
+from embed_packing import DESCRIPTION_LIMIT, EMBEDS_PER_MESSAGE, split_code_aware
+from formatting import format_coming_soon
+from lookup_jobs import (
+    FUZZY_SUGGESTIONS, WorkbookChanged, compute_batch_result, compute_lookup_result, compute_page, loaded_workbooks,
+    parse_batch_names, resolve_pages, timed_call,
+)
+from metrics import METRICS_FILE, METRICS_INTERVAL, metrics, process_metrics_path, process_metrics_paths
+from profiling import busy as profile_busy, profile_call, save_report
+from search_index import normalize
+from workbook import EXCEL_FILE, file_fingerprint, load_workbook, parse_query, peak_rss_mib
 
-EXCEL_FILE = "Copy of Twilight BATs' WWE Champions Tier List.xlsx"
 COMMAND_PREFIX = "!"
 INTENTS = discord.Intents.default()
 INTENTS.message_content = True
-
-EXCLUDED_COLUMN_NAMES = ["Trainer 1", "Trainer 2", "Coach 1", "Coach 2"]
+LOOKUP_CACHE_SIZE = int(os.environ.get("LOOKUP_CACHE_SIZE", "256"))
+WORKBOOK_WATCH_INTERVAL = float(os.environ.get("WORKBOOK_WATCH_INTERVAL", "30"))  # seconds, 0 disables
+LOOKUP_EXECUTOR = os.environ.get("LOOKUP_EXECUTOR", "thread")  # "thread" or "process"
+LOOKUP_WORKERS = int(os.environ.get("LOOKUP_WORKERS", "2"))
+LOOKUP_QUEUE_SIZE = int(os.environ.get("LOOKUP_QUEUE_SIZE", "16"))  # jobs allowed to wait for a worker
+FILTER_HINT_VALUES = 12  # a filter that matches nothing lists the facet's values when it has at most this many
+PROFILE_SLOW_LOOKUP_MS = float(os.environ.get("PROFILE_SLOW_LOOKUP_MS", "0"))  # profile lookup jobs slower than this, 0 disables
+PROFILE_COOLDOWN = float(os.environ.get("PROFILE_COOLDOWN", "300"))  # seconds between automatic profiles
+RELOAD_DIFF_NAMES = 10  # superstars listed per kind of change in the reload log
+DIFF_MARKS = {"added": "➕", "changed": "✏️", "removed": "➖"}
+BATCH_NAME_LIMIT = int(os.environ.get("BATCH_NAME_LIMIT", "20"))  # names one !lookupmany may ask for
+SELECTION_TTL = float(os.environ.get("SELECTION_TTL", "900"))  # seconds a "pick a superstar" menu stays usable
+SELECTION_STORE_SIZE = int(os.environ.get("SELECTION_STORE_SIZE", "1000"))  # open menus remembered at most
+SELECTION_STATE_FILE = os.environ.get("SELECTION_STATE_FILE", "selection_state.json")  # keeps open menus working across restarts
+PAGE_TTL = float(os.environ.get("PAGE_TTL", "900"))  # seconds a result's Previous/Next buttons keep working after the last turn
+PAGE_STORE_SIZE = int(os.environ.get("PAGE_STORE_SIZE", "1000"))  # paged results remembered at most
+PAGE_STATE_FILE = os.environ.get("PAGE_STATE_FILE", "page_state.json")  # keeps page buttons working across restarts
+SHARD_COUNT = os.environ.get("SHARD_COUNT", "")  # unset: no sharding, "auto": Discord's recommended count, or a number
+SHARD_IDS = os.environ.get("SHARD_IDS", "")  # e.g. "0,1": run only these shards in this process (needs a numeric SHARD_COUNT)
+SHARD_PROCESSES = int(os.environ.get("SHARD_PROCESSES", "1"))  # fork this many shard processes that share one loaded workbook
 
 print("📂 Loading Excel file...")
 if not os.path.exists(EXCEL_FILE):
     print(f"❌ File not found: {EXCEL_FILE}")
     exit()
 
-xls = pd.ExcelFile(EXCEL_FILE)
-all_sheets = {}
-sheet_headers = {}
-for sheet_name in xls.sheet_names:
-    try:
-        df = pd.read_excel(xls, sheet_name=sheet_name, header=None)
-        all_sheets[sheet_name] = df
-        if len(df) > 0:
-            sheet_headers[sheet_name] = df.iloc[0].tolist()
-        print(f"✅ Loaded sheet: {sheet_name} ({df.shape[0]} rows, {df.shape[1]} columns)")
-    except Exception as e:
-        print(f"⚠️ Could not read sheet '{sheet_name}': {e}")
-
-if not all_sheets:
+workbook_mtime = os.path.getmtime(EXCEL_FILE)
+workbook = load_workbook(EXCEL_FILE)
+if not workbook.sheet_names:
     print("❌ No sheets could be read.")
     exit()
+print(f"✅ Parsed {len(workbook.superstars)} superstar builds for lookup")
+
+def record_workbook_metrics(wb):
+    metrics.set_gauge("workbook_load_seconds", wb.load_seconds, source=wb.loaded_from)
+    metrics.set_gauge("workbook_sheets", len(wb.sheet_names))
+    metrics.set_gauge("workbook_rows", wb.row_count)
+    metrics.set_gauge("workbook_superstars", len(wb.superstars))
+    metrics.set_gauge("workbook_loaded_timestamp_seconds", time.time())
+
+record_workbook_metrics(workbook)
+
+# Lookups pin the workbook they started with; the pool resolves versions through this registry
+loaded_workbooks[workbook.version] = workbook
+
+def create_lookup_executor():
+    """Pool that runs the CPU-bound part of lookups so the event loop stays free for heartbeats and other commands."""
+    if LOOKUP_EXECUTOR == "process":
+        # spawn rather than fork a live bot. Jobs are lookup_jobs functions, so workers need nothing from
+        # this script, but spawn re-runs the main script in every worker (a second Bot, stores restored
+        # from disk, another pool) unless its spec names it "__main__", which spawn leaves alone.
+        if __name__ == "__main__":
+            sys.modules["__main__"].__spec__ = importlib.machinery.ModuleSpec("__main__", None)
+        return ProcessPoolExecutor(max_workers=LOOKUP_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=LOOKUP_WORKERS, thread_name_prefix="lookup")
+
+lookup_executor = create_lookup_executor()
+# Running + queued lookup jobs; once it's used up new lookups are turned away instead of piling up
+lookup_slots = asyncio.Semaphore(LOOKUP_WORKERS + LOOKUP_QUEUE_SIZE)
+
+# A worker process found a newer workbook on disk than the one this lookup pinned; the watcher swaps it in shortly
+WORKBOOK_CHANGING_MESSAGE = "📂 The workbook is being updated, please try again in a few seconds."
+
+class LookupBusy(Exception):
+    """Raised when the lookup pool's queue is full."""
+
+async def run_lookup_job(func, *args):
+    """Run func(*args) in the lookup pool and await the result, refusing work once the queue is full."""
+    if lookup_slots.locked():
+        raise LookupBusy()
+    async with lookup_slots:
+        loop = asyncio.get_running_loop()
+        result, seconds = await loop.run_in_executor(lookup_executor, functools.partial(timed_call, func, *args))
+    if PROFILE_SLOW_LOOKUP_MS and seconds * 1000 > PROFILE_SLOW_LOOKUP_MS:
+        capture_slow_profile(func, args, seconds)
+    return result
+
+last_profile_at = -math.inf
+profile_tasks = set()  # keeps background profiles referenced until they finish
+
+def describe_job(func, args):
+    """What a lookup job was asked for, short enough for a log line or a profile title."""
+    def quoted(text):
+        return repr(text if len(text) <= 60 else text[:57] + "...")
+
+    # args[0] is the workbook version
+    if func is compute_page:
+        kind, *rest = args[1]
+        what = f"{len(rest)} names" if kind == "batch" else quoted(rest[-1])  # the query, or the superstar picked
+        return f"{func.__name__}({kind} {what}, page {args[2]} from moveset {args[3] + 1})"
+    if func is compute_batch_result:
+        return f"{func.__name__}({len(args[1])} names)"
+    return f"{func.__name__}({quoted(args[1])})"
+
+def capture_slow_profile(func, args, seconds):
+    """Run a slow lookup job again under the profiler in the background and save the report.
+
+    The first run can't be profiled after the fact, so this repeats it; at most one every PROFILE_COOLDOWN seconds.
+    """
+    global last_profile_at
+    job = describe_job(func, args)
+    if profile_busy() or time.monotonic() - last_profile_at < PROFILE_COOLDOWN:
+        metrics.inc("profiles_total", trigger="slow", result="skipped")
+        return
+    last_profile_at = time.monotonic()
+    print(f"🐢 {job} took {seconds * 1000:.0f} ms, capturing a profile")
+
+    async def capture():
+        title = f"Slow lookup job {job}: {seconds * 1000:.0f} ms in the pool"
+        try:
+            _, report, stats = await asyncio.to_thread(profile_call, title, func, *args)
+            path = await asyncio.to_thread(save_report, job, report, stats)
+        except WorkbookChanged:
+            metrics.inc("profiles_total", trigger="slow", result="outdated")
+            print(f"⏭️ Skipped profiling {job}: the workbook it ran on has been replaced since")
+            return
+        except Exception as e:
+            metrics.inc("profiles_total", trigger="slow", result="failed")
+            print(f"⚠️ Could not profile {job}: {e}")
+            return
+        metrics.inc("profiles_total", trigger="slow", result="saved")
+        print(f"🔬 Saved profile of {job} to {path}")
 
-bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=INTENTS)
+    task = asyncio.get_running_loop().create_task(capture())
+    profile_tasks.add(task)
+    task.add_done_callback(profile_tasks.discard)
+
+# Rendered lookups keyed by (query, workbook version), so a changed workbook never serves stale results
+lookup_cache = LRUCache(maxsize=LOOKUP_CACHE_SIZE)
+# Identical lookups running at the same time (a new build just dropped) share one computation
+lookup_flights = SingleFlight()
+# Open selection menus: token -> [workbook version, query, author id, full names on offer]
+selection_store = TTLStore(maxsize=SELECTION_STORE_SIZE, ttl=SELECTION_TTL, path=SELECTION_STATE_FILE)
+if selection_store.load():
+    print(f"✅ Restored {len(selection_store)} open selection menus")
+# Results with more than one page: token -> [workbook version, source (see resolve_pages), page starts, author id]
+page_store = TTLStore(maxsize=PAGE_STORE_SIZE, ttl=PAGE_TTL, path=PAGE_STATE_FILE)
+if page_store.load():
+    print(f"✅ Restored {len(page_store)} paged results")
+
+# Where this process writes its metrics snapshot (one file per process when sharded over several)
+metrics_file = METRICS_FILE
+# Set in the processes forked by run_shard_processes, where the parent watches the workbook instead
+shard_process = None
+
+def create_bot():
+    """A plain Bot, or an AutoShardedBot when SHARD_COUNT is set."""
+    if not SHARD_COUNT:
+        return commands.Bot(command_prefix=COMMAND_PREFIX, intents=INTENTS)
+    shard_count = None if SHARD_COUNT == "auto" else int(SHARD_COUNT)
+    shard_ids = [int(shard_id) for shard_id in SHARD_IDS.split(",")] if SHARD_IDS else None
+    return commands.AutoShardedBot(
+        command_prefix=COMMAND_PREFIX, intents=INTENTS, shard_count=shard_count, shard_ids=shard_ids
+    )
+
+bot = create_bot()
+if SHARD_IDS:
+    metrics_file = process_metrics_path(METRICS_FILE, SHARD_IDS.split(",")[0])
 
 @bot.event
 async def on_ready():
     print(f"✅ Logged in as {bot.user}")
+    if WORKBOOK_WATCH_INTERVAL > 0 and shard_process is None and not watch_workbook.is_running():
+        watch_workbook.start()
+    if METRICS_INTERVAL > 0 and not publish_metrics.is_running():
+        publish_metrics.start()
 
-def get_wrestler_name_column(df):
-    """Try to identify the wrestler name column (usually column A or B after Era)."""
-    if len(df) > 0:
-        headers = df.iloc[0].astype(str)
-        for idx, header in enumerate(headers):
-            if header.lower() in ['era', 'wrestler', 'name']:
-                if header.lower() == 'era' and idx + 1 < len(headers):
-                    return idx + 1
-                return idx
-    return 0
-
-def expand_merged_rows(df, match_indices, name_col_idx):
-    """Expand matched rows to include subsequent rows with blank names (merged cells)."""
-    expanded_indices = set()
-    
-    for idx in match_indices:
-        expanded_indices.add(idx)
-        
-        next_idx = idx + 1
-        while next_idx < len(df):
-            next_val = str(df.iloc[next_idx, name_col_idx]).strip()
-            if next_val == '' or next_val.lower() == 'nan':
-                expanded_indices.add(next_idx)
-                next_idx += 1
-            else:
-                break
-    
-    return sorted(expanded_indices)
+# Serialises reloads; lookups never wait on it
+reload_lock = asyncio.Lock()
 
-def format_moveset_group(df, indices, headers):
-    """Format a group of 3 rows as one moveset in a beautiful modern format."""
-    if not indices or len(indices) == 0:
-        return []
-    
-    first_row = df.iloc[indices[0]]
-    wrestler_info = []
-    for j in range(min(3, len(first_row))):
-        val_str = str(first_row.iloc[j]).strip()
-        if val_str and val_str.lower() != 'nan':
-            wrestler_info.append(val_str)
-    
-    wrestler_header = " | ".join(wrestler_info) if wrestler_info else ""
-    
-    movesets = []
-    moveset_number = 1
-    for i in range(0, len(indices), 3):
-        moveset_indices = indices[i:i+3]
-        if len(moveset_indices) == 0:
+def validate_workbook(new_workbook):
+    """Return why a freshly loaded workbook can't replace the live one, or None if it looks usable."""
+    if not new_workbook.sheet_names:
+        return "no sheets could be read"
+    if not new_workbook.superstars:
+        return "no superstar builds were found"
+    return None
+
+async def reload_workbook(force=False):
+    """Re-read the workbook in a worker thread and swap it in if it changed and looks valid.
+
+    Returns (reloaded, message). Lookups already running keep the snapshot they started with,
+    since the swap only rebinds the module-level `workbook`.
+    """
+    global workbook, workbook_mtime
+    async with reload_lock:
+        if not os.path.exists(EXCEL_FILE):
+            return False, f"❌ File not found: {EXCEL_FILE}"
+        mtime = os.path.getmtime(EXCEL_FILE)
+        if not force:
+            version = await asyncio.to_thread(file_fingerprint, EXCEL_FILE)
+            if version == workbook.version:
+                workbook_mtime = mtime
+                return False, "✅ Workbook unchanged"
+        old_workbook = workbook
+        try:
+            new_workbook = await asyncio.to_thread(load_workbook, EXCEL_FILE, previous=old_workbook)
+        except Exception as e:
+            metrics.inc("workbook_reloads_total", result="failed")
+            return False, f"❌ Could not reload workbook: {e}"
+        problem = validate_workbook(new_workbook)
+        if problem:
+            metrics.inc("workbook_reloads_total", result="rejected")
+            return False, f"❌ Reload rejected, keeping the current workbook: {problem}"
+
+        # Diffing and deciding which cached results survive search both workbooks, so they run off the loop too;
+        # results cached meanwhile for the old version are dropped with the rest
+        changes = await asyncio.to_thread(new_workbook.diff, old_workbook)
+        carried = await asyncio.to_thread(carried_lookup_cache, old_workbook, new_workbook, lookup_cache.items())
+
+        workbook = new_workbook
+        loaded_workbooks[workbook.version] = workbook
+        workbook_mtime = mtime
+        summary = ", ".join(f"{len(labels)} {change}" for change, labels in changes.items())
+        for change, labels in changes.items():
+            metrics.inc("workbook_superstars_changed_total", len(labels), change=change)
+            for label in labels[:RELOAD_DIFF_NAMES]:
+                print(f"   {DIFF_MARKS[change]} {label}")
+            if len(labels) > RELOAD_DIFF_NAMES:
+                print(f"   {DIFF_MARKS[change]} ... and {len(labels) - RELOAD_DIFF_NAMES} more")
+        kept, cached = carry_over_lookup_cache(carried)
+        print(f"🔁 Workbook changes: {summary}; kept {kept} of {cached} cached lookups")
+        metrics.inc("workbook_reloads_total", result="ok")
+        record_workbook_metrics(workbook)
+        return True, f"✅ Reloaded workbook: {len(workbook.superstars)} superstar builds ({summary})"
+
+def same_tier_list(old, new, query):
+    """Whether query shows the same Coming Soon roster (or none) in both workbooks."""
+    tier_list = old.tier_list_matches(query)
+    return tier_list == new.tier_list_matches(query) and (not tier_list or old.coming_soon == new.coming_soon)
+
+def same_roster(old, new, tier_list, page):
+    """Whether a result page shows the same Coming Soon roster (or none) in both workbooks."""
+    return not tier_list or page != 1 or old.coming_soon == new.coming_soon
+
+def same_pages(old, new, positions, source, page):
+    """Whether a page of the result source describes (see resolve_pages) looks the same in new as in old.
+
+    It does if the source resolves to the same header and the same superstars, none of them edited,
+    since a page only shows the builds at its positions (and maybe the roster).
+    """
+    old_header, old_positions, tier_list = resolve_pages(old, source)
+    new_header, new_positions, new_tier_list = resolve_pages(new, source)
+    return (
+        old_header == new_header
+        and tier_list == new_tier_list
+        and [positions.get(position) for position in old_positions] == new_positions
+        and same_roster(old, new, tier_list, page)
+    )
+
+def same_matches(old, new, positions, query):
+    """Whether query finds the same superstars in new as in old, none of them edited.
+
+    positions maps old positions of unchanged superstars to their new ones. Covers everything a
+    cached result is built from: the matches, the "did you mean" suggestions when there are none,
+    and the Coming Soon roster when the query hits the Tier List.
+    """
+    if not same_tier_list(old, new, query):
+        return False
+    old_matches = old.search_positions(query)
+    if [positions.get(position) for position in old_matches] != list(new.search_positions(query)):
+        return False
+    if not old_matches:
+        old_suggestions = old.suggest_positions(query, limit=FUZZY_SUGGESTIONS)
+        new_suggestions = new.suggest_positions(query, limit=FUZZY_SUGGESTIONS)
+        return [positions.get(position) for position in old_suggestions] == new_suggestions
+    return True
+
+def carried_lookup_cache(old, new, entries):
+    """The cached results (key, value) the edit can't have changed, re-keyed for the new workbook version.
+
+    Positions inside results and keys are moved to where those superstars sit now. Only reads the
+    workbooks and the entries given, so it can run in a worker thread.
+    """
+    positions = new.unchanged_positions(old)
+    carried = []
+    for key, value in entries:
+        kind, query, version = key[:3]
+        if version != old.version:
             continue
-        
-        moves = []
-        for idx in moveset_indices:
-            row = df.iloc[idx]
-            if len(row) > 3:
-                move = str(row.iloc[3]).strip()
-                if move and move.lower() != 'nan':
-                    moves.append(move)
-        
-        other_info = {}
-        for idx in moveset_indices:
-            row = df.iloc[idx]
-            for j in range(4, len(row)):
-                header_idx = j if j < len(headers) else -1
-                if header_idx >= 0:
-                    header = str(headers[header_idx]).strip()
-                    val = str(row.iloc[j]).strip()
-                    
-                    if val and val.lower() != 'nan' and header and header.lower() != 'nan':
-                        if header not in other_info:
-                            other_info[header] = []
-                        if val not in other_info[header]:
-                            other_info[header].append(val)
-        
-        # Build the formatted text with modern styling
-        formatted_parts = []
-        
-        # Header with emoji
-        formatted_parts.append(f"🎯 **MOVESET #{moveset_number}**")
-        # Determine Coming Soon tag by scanning early cells across the grouped rows
-        is_coming_soon = False
-        for idx_scan in indices:
-            row_scan = df.iloc[idx_scan]
-            for j in range(min(5, len(row_scan))):
-                val = str(row_scan.iloc[j]).strip()
-                if val and val.lower().startswith("coming soon"):
-                    is_coming_soon = True
-                    break
-            if is_coming_soon:
-                break
-        display_header = wrestler_header
-        if is_coming_soon:
-            display_header = f"{wrestler_header} — Coming Soon" if wrestler_header else "Coming Soon"
-        # Append Tier Feud Poster suffix
-        if display_header:
-            display_header = f"{display_header} Tier Feud Poster"
-        formatted_parts.append(f"**{display_header}**\n")
-        
-        # Moves section
-        if moves:
-            formatted_parts.append("⚡ **MOVES**")
-            formatted_parts.append("```diff")
-            import re
-            def get_move_color_emoji(move_text: str) -> str:
-                t = move_text.upper()
-                # Prefer explicit tokens with optional number suffix (e.g., BLK, BLU3, R1)
-                m = re.search(r"\b(BLK|BLU|G|Y|P|R)[0-9]?\b", t)
-                token = m.group(1) if m else None
-                if token == "BLK":
-                    return "⚫"
-                if token == "BLU":
-                    return "🔵"
-                if token == "G":
-                    return "🟢"
-                if token == "Y":
-                    return "🟡"
-                if token == "P":
-                    return "🟣"
-                if token == "R":
-                    return "🔴"
-                # Fallback to full color words or common alt-abbreviations
-                if re.search(r"\bBLACK\b", t):
-                    return "⚫"
-                if re.search(r"\bBLUE\b", t):
-                    return "🔵"
-                if re.search(r"\bGREEN\b|\bGRN\b", t):
-                    return "🟢"
-                if re.search(r"\bYELLOW\b|\bYLW\b", t):
-                    return "🟡"
-                if re.search(r"\bPURPLE\b|\bPUR\b", t):
-                    return "🟣"
-                if re.search(r"\bRED\b", t):
-                    return "🔴"
-                return "⚡"
-            for idx, move in enumerate(moves, 1):
-                move_emoji = get_move_color_emoji(move)
-                formatted_parts.append(f"+ {move_emoji} {move}")
-            formatted_parts.append("```\n")
-        
-        # Trainers section
-        trainers = []
-        if "Trainer 1" in other_info:
-            trainers.extend(other_info["Trainer 1"])
-        if "Trainer 2" in other_info:
-            trainers.extend(other_info["Trainer 2"])
-        
-        if trainers:
-            formatted_parts.append("💪 **TRAINERS**")
-            formatted_parts.append("```yaml")
-            for t in trainers:
-                formatted_parts.append(f"• {t}")
-            formatted_parts.append("```\n")
-        
-        # Coaches section
-        coaches = []
-        if "Coach 1" in other_info:
-            coaches.extend(other_info["Coach 1"])
-        if "Coach 2" in other_info:
-            coaches.extend(other_info["Coach 2"])
-        
-        if coaches:
-            formatted_parts.append("👑 **COACHES**")
-            formatted_parts.append("```yaml")
-            for c in coaches:
-                formatted_parts.append(f"• {c}")
-            formatted_parts.append("```\n")
-        
-        # Skill Plates
-        if "Skill Plates" in other_info:
-            formatted_parts.append("⭐ **SKILL PLATES**")
-            formatted_parts.append("```yaml")
-            for p in other_info["Skill Plates"]:
-                formatted_parts.append(f"• {p}")
-            formatted_parts.append("```\n")
-        
-        # Ultimate Plates
-        if "Ultimate Plates" in other_info:
-            formatted_parts.append("✨ **ULTIMATE PLATES**")
-            formatted_parts.append("```yaml")
-            for p in other_info["Ultimate Plates"]:
-                formatted_parts.append(f"• {p}")
-            formatted_parts.append("```\n")
-        
-        # Gear & Moments
-        if "Gear & Moments" in other_info:
-            formatted_parts.append("🎒 **GEAR & MOMENTS**")
-            formatted_parts.append("```yaml")
-            for g in other_info["Gear & Moments"]:
-                formatted_parts.append(f"• {g}")
-            formatted_parts.append("```\n")
-        
-        # Tag Links
-        if "Tag Links" in other_info:
-            formatted_parts.append("🤝 **TAG LINKS**")
-            formatted_parts.append("```yaml")
-            for t in other_info["Tag Links"]:
-                formatted_parts.append(f"• {t}")
-            formatted_parts.append("```\n")
-        
-        # Entourage Ability
-        if "Entourage Ability" in other_info:
-            formatted_parts.append("👥 **ENTOURAGE**")
-            formatted_parts.append("```yaml")
-            for e in other_info["Entourage Ability"]:
-                formatted_parts.append(f"• {e}")
-            formatted_parts.append("```\n")
-        
-        # Notes
-        if "Notes" in other_info:
-            formatted_parts.append("📝 **NOTES**")
-            formatted_parts.append("```")
-            for n in other_info["Notes"]:
-                formatted_parts.append(f"• {n}")
-            formatted_parts.append("```\n")
-        
-        # Gameplay Videos
-        if "Gameplay Videos" in other_info:
-            formatted_parts.append("🎬 **GAMEPLAY VIDEOS**")
-            for v in other_info["Gameplay Videos"]:
-                # Make sure the URL is clickable - format as Discord hyperlink
-                v_stripped = v.strip()
-                if v_stripped.startswith(("http://", "https://")):
-                    # Full URL - make it clickable
-                    formatted_parts.append(f"🔗 [Watch Video]({v_stripped})")
-                elif v_stripped.startswith("www."):
-                    # URL without protocol - add https
-                    url = f"https://{v_stripped}"
-                    formatted_parts.append(f"🔗 [Watch Video]({url})")
-                elif "youtube.com" in v_stripped.lower() or "youtu.be" in v_stripped.lower():
-                    # YouTube link without protocol
-                    url = v_stripped if v_stripped.startswith("http") else f"https://{v_stripped}"
-                    formatted_parts.append(f"🔗 [Watch Video]({url})")
-                else:
-                    # Not a recognizable URL format - display as-is
-                    formatted_parts.append(f"🔗 {v_stripped}")
-            formatted_parts.append("")  # Empty line for spacing
-        
-        movesets.append("\n".join(formatted_parts))
-        moveset_number += 1
-    
-    return movesets
+        if kind == "lookup" and same_matches(old, new, positions, query):
+            value = dict(value, choices=[
+                (full_name, [positions[position] for position in choice]) for full_name, choice in value["choices"]
+            ])
+            key = (kind, query, new.version)
+        elif kind == "page" and same_pages(old, new, positions, query, key[3]):
+            # query is the page source here
+            key = (kind, query, new.version, *key[3:])
+        elif kind == "batch" and all(same_matches(old, new, positions, name) for name in query):
+            key = (kind, query, new.version)
+        else:
+            continue
+        carried.append((key, value))
+    return carried
+
+def carry_over_lookup_cache(carried):
+    """Replace the lookup cache's contents with the entries carried over to the new workbook. Returns (kept, cached)."""
+    cached = len(lookup_cache)
+    lookup_cache.clear()
+    for key, value in carried:
+        lookup_cache.put(key, value)
+    metrics.inc("lookup_cache_carried_total", len(carried))
+    metrics.inc("lookup_cache_dropped_total", cached - len(carried))
+    return len(carried), cached
+
+@tasks.loop(seconds=max(METRICS_INTERVAL, 1))
+async def publish_metrics():
+    """Write the metrics snapshot that web_app.py serves on /metrics and /health."""
+    cache_stats = lookup_cache.stats()
+    for name in ("hits", "misses", "evictions"):
+        metrics.set_gauge(f"lookup_cache_{name}", cache_stats[name])
+    metrics.set_gauge("lookup_cache_entries", cache_stats["size"])
+    for store_name, store in (("selection_menus", selection_store), ("result_pages", page_store)):
+        store_stats = store.stats()
+        metrics.set_gauge("state_store_entries", store_stats["size"], store=store_name)
+        for name in ("expired", "evictions"):
+            metrics.set_gauge(f"state_store_{name}", store_stats[name], store=store_name)
+    peak_rss = peak_rss_mib()
+    if peak_rss is not None:
+        metrics.set_gauge("process_peak_rss_mib", peak_rss)
+    status = {
+        "bot_user": str(bot.user),
+        "guilds": len(bot.guilds),
+        "gateway_latency_ms": None if math.isnan(bot.latency) else round(bot.latency * 1000, 1),
+        "shard_ids": getattr(bot, "shard_ids", None),
+        "shard_count": bot.shard_count,
+        "workbook_version": workbook.version,
+        "workbook_loaded_from": workbook.loaded_from,
+        "sheets": len(workbook.sheet_names),
+        "rows": workbook.row_count,
+        "superstars": len(workbook.superstars),
+        "peak_rss_mib": peak_rss,
+        "coming_soon": list(workbook.coming_soon),
+        "lookup_cache": cache_stats,
+        "lookups_in_flight": len(lookup_flights),
+        "open_selection_menus": len(selection_store),
+        "paged_results": len(page_store),
+        "lookups_coalesced": lookup_flights.coalesced,
+    }
+    try:
+        await asyncio.to_thread(metrics.write, metrics_file, status)
+    except OSError as e:
+        print(f"⚠️ Could not write metrics: {e}")
+
+def workbook_changed_on_disk():
+    """Whether the workbook file's mtime differs from the one the live workbook was read at."""
+    try:
+        return os.path.getmtime(EXCEL_FILE) != workbook_mtime
+    except OSError:
+        return False
+
+@tasks.loop(seconds=max(WORKBOOK_WATCH_INTERVAL, 1))
+async def watch_workbook():
+    """Reload the workbook when the file on disk changes."""
+    if workbook_changed_on_disk():
+        print("📂 Workbook changed on disk, reloading...")
+        _, message = await reload_workbook()
+        print(message)
+
+def filter_hints(wb, query):
+    """Why a filtered query found nothing: the filters that match nothing on their own, with the values they could take."""
+    hints = []
+    for facet, value in parse_query(query)[1]:
+        if wb.facets.match([(facet, value)]):
+            continue
+        values = wb.facets.values(facet)
+        hint = f"- No {facet} contains **{value}**."
+        if 0 < len(values) <= FILTER_HINT_VALUES:
+            hint += " Try one of: " + ", ".join(values)
+        hints.append(hint)
+    return hints or ["- Each filter matches something, just not all of them together."]
+
+def record_stage_timings(timings):
+    for stage, seconds in timings.items():
+        metrics.observe("lookup_stage_seconds", seconds, stage=stage)
+
+async def run_coalesced(key, func, *args):
+    """lookup_flights.run that counts the callers who joined a computation already in progress."""
+    if key in lookup_flights:
+        metrics.inc("lookups_coalesced_total", kind=key[0])
+        print(f"🤝 Joining in-flight {key[0]} for: {key[1]}")
+    return await lookup_flights.run(key, func, *args)
+
+async def get_lookup_result(wb, name):
+    """Search and render a query, reusing the cached result for this workbook version when there is one."""
+    cache_key = ("lookup", normalize(name), wb.version)
+    result = lookup_cache.get(cache_key)
+    if result is not None:
+        print(f"⚡ Cache hit for: {name}")
+        return result
+
+    async def compute():
+        result = await run_lookup_job(compute_lookup_result, wb.version, name)
+        record_stage_timings(result.pop("timings"))
+        lookup_cache.put(cache_key, result)
+        return result
+
+    # Same key as the cache, so concurrent callers share the work even with the cache turned off
+    return await run_coalesced(cache_key, compute)
 
-@bot.command(name="lookup")
+async def get_page(wb, source, page=1, start=0):
+    """One page of the result source describes (see resolve_pages), cached and coalesced like the lookup itself."""
+    cache_key = ("page", tuple(source), wb.version, page, start)
+    rendered = lookup_cache.get(cache_key)
+    if rendered is not None:
+        return rendered
+
+    async def compute():
+        rendered, timings = await run_lookup_job(compute_page, wb.version, source, page, start)
+        record_stage_timings(timings)
+        lookup_cache.put(cache_key, rendered)
+        return rendered
+
+    return await run_coalesced(cache_key, compute)
+
+async def get_batch_result(wb, names):
+    """The first page of a whole batch, cached and coalesced like single lookups."""
+    cache_key = ("batch", tuple(normalize(name) for name in names), wb.version)
+    result = lookup_cache.get(cache_key)
+    if result is not None:
+        return result
+
+    async def compute():
+        result = await run_lookup_job(compute_batch_result, wb.version, names)
+        record_stage_timings(result.pop("timings"))
+        lookup_cache.put(cache_key, result)
+        return result
+
+    return await run_coalesced(cache_key, compute)
+
+async def timed_send(ctx, *args, **kwargs):
+    """ctx.send that records how long Discord took (rate limits show up here)."""
+    with metrics.timer("lookup_stage_seconds", stage="send"):
+        return await ctx.send(*args, **kwargs)
+
+def page_embeds(rendered):
+    embeds = [discord.Embed.from_dict(embed_data) for embed_data in rendered["embeds"]]
+    embeds[-1].timestamp = discord.utils.utcnow()
+    return embeds
+
+async def send_first_page(send, wb, author_id, source, rendered):
+    """Send page 1 of a result through send (ctx.send or interaction.followup.send).
+
+    When movesets are left over it gets Previous/Next buttons, and the result's source (see
+    resolve_pages) goes into page_store; nothing past page 1 is formatted or sent until asked for.
+    """
+    # Up to 10 embeds go out in one request instead of one request per embed
+    saved = len(rendered["embeds"]) - 1
+    metrics.inc("discord_requests_saved_total", saved)
+    print(f"📦 Sending {len(rendered['embeds'])} embeds (movesets {rendered['start'] + 1}–{rendered['end']} of {rendered['total']}), saved {saved} requests")
+    kwargs = {}
+    if rendered["end"] < rendered["total"]:
+        token = secrets.token_urlsafe(8)
+        page_store.put(token, [wb.version, list(source), [0, rendered["end"]], author_id])
+        kwargs["view"] = page_view(token, 1, True)
+        metrics.inc("result_pages_total", outcome="paged")
+    with metrics.timer("lookup_stage_seconds", stage="send"):
+        await send(embeds=page_embeds(rendered), **kwargs)
+    if kwargs:
+        await save_state(page_store, "result pages")
+
+async def save_state(store, what):
+    try:
+        await asyncio.to_thread(store.save, store.dump())
+    except OSError as e:
+        print(f"⚠️ Could not save {what}: {e}")
+
+class LookupPicker(discord.ui.DynamicItem[discord.ui.Select], template=r"lookup-pick:(?P<token>[\w-]+)"):
+    """The "pick a superstar" menu under an ambiguous lookup.
+
+    The custom id only carries a short token into selection_store (workbook version, query, author
+    and the full names on offer), and each option's value is its index in those names, so nothing
+    rendered is kept while users decide. Registered with the bot, so menus keep working across restarts until they expire.
+    """
+
+    def __init__(self, token, options=()):
+        super().__init__(discord.ui.Select(
+            custom_id=f"lookup-pick:{token}",
+            placeholder="Pick a superstar to view",
+            options=list(options),
+        ))
+        self.token = token
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["token"], item.options)
+
+    async def callback(self, interaction):
+        await pick_selection(interaction, self.token, interaction.data["values"][0])
+
+bot.add_dynamic_items(LookupPicker)
+
+async def pick_selection(interaction, token, value):
+    """Show the superstar picked from a LookupPicker menu."""
+    state = selection_store.get(token)
+    if state is None:
+        metrics.inc("selections_total", outcome="expired")
+        await interaction.response.send_message("⏱️ This menu has expired. Please run the command again.", ephemeral=True)
+        return
+    version, name, author_id, full_names = state
+    if interaction.user.id != author_id:
+        metrics.inc("selections_total", outcome="not_author")
+        await interaction.response.send_message("🙅 Only the person who ran this lookup can pick from it.", ephemeral=True)
+        return
+    wb = loaded_workbooks.get(version)
+    if wb is None:
+        # The workbook changed since the menu was posted, so the same query may find other superstars now
+        metrics.inc("selections_total", outcome="outdated")
+        selection_store.pop(token)
+        await interaction.response.edit_message(
+            content="📂 The workbook has been updated since this menu was posted. Please run the command again.", view=None
+        )
+        await save_state(selection_store, "selection menus")
+        return
+
+    full_name = full_names[int(value)]
+    selection_store.pop(token)
+    # Replacing the menu with the pick also answers the interaction within Discord's 3 seconds
+    await interaction.response.edit_message(content=f"✅ {full_name}", view=None)
+    await save_state(selection_store, "selection menus")
+    source = ["pick", name, full_name]
+    try:
+        rendered = await get_page(wb, source)
+    except LookupBusy:
+        metrics.inc("selections_total", outcome="busy")
+        await interaction.followup.send("⏳ Lots of lookups right now, please try again in a few seconds.")
+        return
+    except WorkbookChanged:
+        metrics.inc("selections_total", outcome="outdated")
+        await interaction.followup.send("📂 The workbook has been updated since this menu was posted. Please run the command again.")
+        return
+    metrics.inc("selections_total", outcome="picked")
+    await send_first_page(interaction.followup.send, wb, interaction.user.id, source, rendered)
+
+class PageButton(discord.ui.DynamicItem[discord.ui.Button], template=r"lookup-page:(?P<token>[\w-]+):(?P<page>\d+)"):
+    """Previous/Next under a result with more than one page.
+
+    Like LookupPicker, the custom id only carries a token into page_store (what the pages are
+    rendered from) and the page the button goes to. Registered with the bot, so the buttons keep
+    working across restarts until they expire.
+    """
+
+    def __init__(self, token, page, label, disabled=False):
+        super().__init__(discord.ui.Button(
+            custom_id=f"lookup-page:{token}:{page}",
+            label=label,
+            style=discord.ButtonStyle.secondary,
+            disabled=disabled,
+        ))
+        self.token = token
+        self.page = page
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["token"], int(match["page"]), item.label, item.disabled)
+
+    async def callback(self, interaction):
+        await turn_page(interaction, self.token, self.page)
+
+bot.add_dynamic_items(PageButton)
+
+def page_view(token, page, has_next):
+    view = discord.ui.View(timeout=None)
+    view.add_item(PageButton(token, page - 1, "◀ Previous", disabled=page == 1))
+    view.add_item(PageButton(token, page + 1, "Next ▶", disabled=not has_next))
+    return view
+
+async def retire_page_buttons(interaction, token):
+    """The workbook changed since these results were posted: keep what's shown, drop the buttons."""
+    # The positions would point at other builds in the new workbook
+    metrics.inc("result_pages_total", outcome="outdated")
+    page_store.pop(token)
+    await interaction.response.edit_message(
+        content="📂 The workbook has been updated since these results were posted. Please run the command again.", view=None
+    )
+    await save_state(page_store, "result pages")
+
+async def turn_page(interaction, token, page):
+    """Render a result page on demand and show it in place of the current one."""
+    state = page_store.get(token)
+    if state is None:
+        metrics.inc("result_pages_total", outcome="expired")
+        await interaction.response.send_message("⏱️ These buttons have expired. Please run the command again.", ephemeral=True)
+        return
+    version, source, starts, author_id = state
+    if interaction.user.id != author_id:
+        metrics.inc("result_pages_total", outcome="not_author")
+        await interaction.response.send_message("🙅 Only the person who ran this lookup can turn its pages.", ephemeral=True)
+        return
+    wb = loaded_workbooks.get(version)
+    if wb is None:
+        await retire_page_buttons(interaction, token)
+        return
+
+    # Pages are only reachable one step at a time, so the start of this one is known by now
+    page = min(max(page, 1), len(starts))
+    try:
+        # Rendering a page takes milliseconds, well inside the 3 seconds Discord gives to answer
+        rendered = await get_page(wb, source, page, starts[page - 1])
+    except LookupBusy:
+        metrics.inc("result_pages_total", outcome="busy")
+        await interaction.response.send_message("⏳ Lots of lookups right now, please try again in a few seconds.", ephemeral=True)
+        return
+    except WorkbookChanged:
+        await retire_page_buttons(interaction, token)
+        return
+    has_next = rendered["end"] < rendered["total"]
+    if has_next and len(starts) == page:
+        starts.append(rendered["end"])
+    page_store.put(token, state)  # turning pages keeps the buttons alive
+    metrics.inc("result_pages_total", outcome="turned")
+    await interaction.response.edit_message(embeds=page_embeds(rendered), view=page_view(token, page, has_next))
+    await save_state(page_store, "result pages")
+
+@bot.hybrid_command(name="lookup")
+@app_commands.describe(name="Superstar name (or pick a Wrestler | Era | Class from the list), and/or filters like class:tech era:attitude")
 async def lookup(ctx, *, name: str):
-    """Search all Excel sheets for a wrestler name (excluding Trainer/Coach columns and Tier List sheet)."""
+    """Search all Excel sheets for a wrestler name (excluding Trainer/Coach columns and Tier List sheet).
+
+    Filters narrow it down, or stand in for the name: class:, era:, sheet:, trainer: and coach:.
+    """
     name = name.strip()
     print(f"🔍 Searching for: {name}")
+    # Slash commands must be answered within 3 seconds; no-op for !lookup
+    await ctx.defer()
 
-    results_by_sheet = {}
-    tier_list_entries = []
-    all_superstar_data = {}  # Store data per superstar for selection
-
-    for sheet_name, df in all_sheets.items():
-        # Special handling for 'Tier List': only consider row 7 (index 6) and place in separate embed
-        if sheet_name.lower() == "tier list":
-            if len(df) > 6:
-                row = df.iloc[6]
-                # If any cell in row 7 contains the search term, surface it
-                row_strs = [str(cell) for cell in row.tolist()]
-                if any(name.lower() in s.lower() for s in row_strs):
-                    # Collect ONLY superstar names from the row
-                    names = []
-                    seen = set()
-                    for j in range(len(row)):
-                        raw_val = row.iloc[j]
-                        val = str(raw_val).strip()
-                        if not val or val.lower() == 'nan':
-                            continue
-                        lower_val = val.lower()
-                        # Skip intro/marketing or markers
-                        if lower_val.startswith("coming soon"):
-                            continue
-                        if lower_val.startswith("brought to you by"):
-                            continue
-                        # Split on commas to handle multiple names in one cell
-                        parts = [p.strip() for p in val.split(',')]
-                        for p in parts:
-                            if not p:
-                                continue
-                            key = p.lower()
-                            if key not in seen:
-                                seen.add(key)
-                                names.append(p)
-                    if names:
-                        pretty_block = "\n".join(f"• {n}" for n in names)
-                        tier_list_entries.append(f"**Coming Soon (Tier List Row 7)**\n{pretty_block}")
-            continue
-        
-        df_original = df.copy()
-        original_headers = sheet_headers.get(sheet_name, [])
-        
-        name_col_idx = get_wrestler_name_column(df_original)
-        
-        excluded_cols = []
-        if len(df_original) > 0:
-            df_headers = df_original.iloc[0].astype(str)
-            
-            for idx, header in enumerate(df_headers):
-                if any(excluded_name.lower() in header.lower() for excluded_name in EXCLUDED_COLUMN_NAMES):
-                    excluded_cols.append(idx)
-            
-            cols_to_search = [i for i in range(len(df_original.columns)) if i not in excluded_cols]
-            df_to_search = df_original.iloc[:, cols_to_search]
-            
-            df_to_display = df_original
-            display_headers = original_headers
-            
-            if name_col_idx is not None:
-                removed_before = sum(1 for col in excluded_cols if col < name_col_idx)
-                search_name_col_idx = name_col_idx - removed_before
-            else:
-                search_name_col_idx = None
-        else:
-            df_to_search = df_original
-            df_to_display = df_original
-            display_headers = original_headers
-            search_name_col_idx = None
-        
-        mask = df_to_search.astype(str).apply(lambda x: x.str.contains(name, case=False, na=False))
-        match_indices = df_to_search[mask.any(axis=1)].index.tolist()
-        
-        if match_indices and search_name_col_idx is not None:
-            match_indices = expand_merged_rows(df_to_search, match_indices, search_name_col_idx)
-        
-        if match_indices:
-            # Extract full superstar names from raw data (including variant/class) for grouping
-            for i in range(0, len(match_indices), 3):
-                moveset_group = match_indices[i:i+3]
-                if moveset_group:
-                    first_row = df_original.iloc[moveset_group[0]]
-                    # Build full name from first 3 columns (Wrestler | Era | Class)
-                    full_name_parts = []
-                    for j in range(min(3, len(first_row))):
-                        val = str(first_row.iloc[j]).strip()
-                        if val and val.lower() != 'nan':
-                            full_name_parts.append(val)
-                    full_superstar_name = " | ".join(full_name_parts) if full_name_parts else "Unknown"
-                    
-                    # Use full name as key for better identification
-                    if full_superstar_name not in all_superstar_data:
-                        all_superstar_data[full_superstar_name] = {}
-                    if sheet_name not in all_superstar_data[full_superstar_name]:
-                        all_superstar_data[full_superstar_name][sheet_name] = []
-            
-            movesets = format_moveset_group(df_to_display, match_indices, display_headers)
-            if movesets:
-                # Group movesets by full superstar name
-                for moveset_idx, moveset in enumerate(movesets):
-                    # Find which superstar this moveset belongs to
-                    moveset_group_start = moveset_idx * 3
-                    if moveset_group_start < len(match_indices):
-                        moveset_group = match_indices[moveset_group_start:min(moveset_group_start + 3, len(match_indices))]
-                        if moveset_group:
-                            first_row = df_original.iloc[moveset_group[0]]
-                            full_name_parts = []
-                            for j in range(min(3, len(first_row))):
-                                val = str(first_row.iloc[j]).strip()
-                                if val and val.lower() != 'nan':
-                                    full_name_parts.append(val)
-                            full_superstar_name = " | ".join(full_name_parts) if full_name_parts else "Unknown"
-                            
-                            if full_superstar_name in all_superstar_data and sheet_name in all_superstar_data[full_superstar_name]:
-                                all_superstar_data[full_superstar_name][sheet_name].append(moveset)
-                results_by_sheet[sheet_name] = movesets
-
-    if not results_by_sheet and not tier_list_entries:
-        await ctx.send(
+    wb = workbook  # pin this snapshot so a reload mid-command can't mix versions
+    try:
+        result = await get_lookup_result(wb, name)
+    except LookupBusy:
+        metrics.inc("lookups_total", outcome="busy")
+        await timed_send(ctx, "⏳ Lots of lookups right now, please try again in a few seconds.")
+        return
+    except WorkbookChanged:
+        metrics.inc("lookups_total", outcome="outdated")
+        await timed_send(ctx, WORKBOOK_CHANGING_MESSAGE)
+        return
+    choices = result["choices"]
+
+    filters = parse_query(name)[1]
+    for facet, _ in filters:
+        metrics.inc("lookup_filters_total", facet=facet)
+
+    if not choices and not result["tier_list_entries"]:
+        metrics.inc("lookups_total", outcome="not_found")
+        if filters:
+            await timed_send(ctx, "\n".join([f"❌ No superstars match **{name}**."] + filter_hints(wb, name))[:2000])
+            return
+        await timed_send(ctx,
             f"❌ No results found for **{name}**.\n"
             f"- Double-check the spelling.\n"
             f"- Or this superstar may not have a viable feud build at 6★ Gold."
         )
         return
 
-    # Check if multiple distinct superstars found - show selection menu
-    if len(all_superstar_data) > 1:
-        number_emojis = ['1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣', '6️⃣', '7️⃣', '8️⃣', '9️⃣', '🔟']
-        superstar_list = list(all_superstar_data.keys())[:10]  # Max 10 options
-        
-        selection_text = "**Multiple superstars found!** Please react with the number to view:\n\n"
-        for idx, superstar in enumerate(superstar_list):
-            selection_text += f"{number_emojis[idx]} {superstar}\n"
-        
-        selection_msg = await ctx.send(selection_text)
-        
-        # Add reactions
-        for idx in range(len(superstar_list)):
-            await selection_msg.add_reaction(number_emojis[idx])
-        
-        # Wait for reaction from the command author
-        def check(reaction, user):
-            return user == ctx.author and str(reaction.emoji) in number_emojis[:len(superstar_list)] and reaction.message.id == selection_msg.id
-        
-        try:
-            reaction, user = await bot.wait_for('reaction_add', timeout=60.0, check=check)
-            selected_idx = number_emojis.index(str(reaction.emoji))
-            selected_superstar = superstar_list[selected_idx]
-            
-            # Filter results to only show selected superstar
-            results_by_sheet = all_superstar_data[selected_superstar].copy()
-            await selection_msg.delete()  # Remove selection message
-            
-        except asyncio.TimeoutError:
-            await ctx.send("⏱️ Selection timed out. Please run the command again.")
-            return
-    
-    def split_long_text(text, max_length=1020):
-        """Split text into chunks that fit within Discord field limits, trying to preserve line breaks."""
-        if len(text) <= max_length:
-            return [text]
-        
-        chunks = []
-        lines = text.split('\n')
-        current_chunk = []
-        current_length = 0
-        
-        for line in lines:
-            line_with_newline = line + '\n' if line != lines[-1] else line
-            line_length = len(line_with_newline)
-            
-            if current_length + line_length > max_length and current_chunk:
-                # Save current chunk and start new one
-                chunks.append('\n'.join(current_chunk))
-                current_chunk = [line]
-                current_length = len(line)
-            else:
-                current_chunk.append(line)
-                current_length += line_length
-        
-        if current_chunk:
-            chunks.append('\n'.join(current_chunk))
-        
-        return chunks
-    
-    embeds = []
-    # Add a separate embed for Tier List coming soon entries if present
-    if tier_list_entries:
-        # Join entries but keep each as its own section
-        tier_description = "\n\n".join(tier_list_entries)
-        # If very long, split into chunks across multiple embeds
-        max_desc_len = 3500
-        tier_chunks = []
-        if len(tier_description) <= max_desc_len:
-            tier_chunks = [tier_description]
+    # Several distinct superstars (or "did you mean" suggestions): one message with a menu to pick from
+    if result["page"] is None:
+        if result["suggested"]:
+            selection_text = f"🤔 No exact match for **{name}**. Did you mean one of these? Pick one from the menu to view it."
         else:
-            # Split on double newlines between entries to avoid breaking code blocks
-            sections = tier_description.split("\n\n")
-            current = []
-            current_len = 0
-            for sec in sections:
-                add_len = len(sec) + 2
-                if current_len + add_len > max_desc_len and current:
-                    tier_chunks.append("\n\n".join(current))
-                    current = [sec]
-                    current_len = len(sec)
-                else:
-                    current.append(sec)
-                    current_len += add_len
-            if current:
-                tier_chunks.append("\n\n".join(current))
-        
-        for idx_chunk, chunk in enumerate(tier_chunks):
-            tier_embed = discord.Embed(
-                title="🕒 Coming Soon (Tier List)" + (f" — Part {idx_chunk+1}" if len(tier_chunks) > 1 else ""),
-                description=chunk,
-                color=0xF1C40F
-            )
-            tier_embed.set_footer(text="Tier List — Row 7 only")
-            embeds.append(tier_embed)
-
-    # Color mapping for different sheets to make embeds more colorful
-    def get_embed_color(sheet_name: str) -> int:
-        s = sheet_name.lower()
-        if "strikers" in s:
-            return 0x000000  # black
-        if "acros" in s or "acro" in s:
-            return 0x3498DB  # blue
-        if "tech" in s:
-            return 0x2ECC71  # green
-        if "trick" in s:
-            return 0x9B59B6  # purple
-        if "phs" in s or "powerhouse" in s:
-            return 0xE74C3C  # red
-        if "sbs" in s or "showboat" in s:
-            return 0xF1C40F  # yellow
-        if "tier list" in s:
-            return 0xF1C40F  # gold
-        return 0x5865F2  # default blurple
-
-    current_embed = discord.Embed(
-        title=f"🔍 Search Results: {name.title()}",
-        description="📋 **All matching entries across sheets:**\n⚠️ Note: Results only include superstars with feud builds at 6★ Gold.",
-        color=0x5865F2  # default; will be adjusted per sheet when possible
+            selection_text = "**Multiple superstars found!** Pick one from the menu to view it."
+        if result["choice_count"] > len(choices):
+            selection_text += f"\nShowing the first {len(choices)} of {result['choice_count']}, type more of the name to narrow it down."
+
+        token = secrets.token_urlsafe(8)
+        selection_store.put(token, [wb.version, name, ctx.author.id, [full_name for full_name, _ in choices]])
+        options = [discord.SelectOption(label=full_name[:100], value=str(index)) for index, (full_name, _) in enumerate(choices)]
+        view = discord.ui.View(timeout=None)
+        view.add_item(LookupPicker(token, options))
+        metrics.inc("lookups_total", outcome="suggested" if result["suggested"] else "multiple")
+        await timed_send(ctx, selection_text, view=view)
+        await save_state(selection_store, "selection menus")
+        return
+
+    metrics.inc("lookups_total", outcome="filtered" if filters else "found")
+    await send_first_page(ctx.send, wb, ctx.author.id, ["lookup", name], result["page"])
+
+@bot.hybrid_command(name="lookupmany")
+@app_commands.describe(names="Superstar names separated by commas")
+async def lookupmany(ctx, *, names: str):
+    """Look up a list of superstars (comma or newline separated) at once."""
+    batch = parse_batch_names(names)
+    if not batch:
+        await ctx.send("❌ Give me some names to look up, separated by commas or new lines.")
+        return
+    skipped = batch[BATCH_NAME_LIMIT:]
+    batch = batch[:BATCH_NAME_LIMIT]
+    print(f"🔍 Batch lookup of {len(batch)} names")
+    await ctx.defer()
+
+    wb = workbook
+    try:
+        result = await get_batch_result(wb, batch)
+    except LookupBusy:
+        metrics.inc("lookups_total", outcome="busy")
+        await timed_send(ctx, "⏳ Lots of lookups right now, please try again in a few seconds.")
+        return
+    except WorkbookChanged:
+        metrics.inc("lookups_total", outcome="outdated")
+        await timed_send(ctx, WORKBOOK_CHANGING_MESSAGE)
+        return
+    metrics.inc("lookups_total", outcome="batch")
+    metrics.inc("batch_names_total", len(batch))
+    if skipped:
+        await timed_send(ctx, f"✂️ Only the first {BATCH_NAME_LIMIT} names are looked up, skipped: {', '.join(skipped)}"[:2000])
+    await send_first_page(ctx.send, wb, ctx.author.id, ["batch", *batch], result["page"])
+
+@lookup.autocomplete("name")
+async def lookup_name_autocomplete(interaction: discord.Interaction, current: str):
+    """Suggest full superstar names from the in-memory prefix index (no searching, so it stays fast)."""
+    return [app_commands.Choice(name=full_name[:100], value=full_name[:100]) for full_name in workbook.complete(current)]
+
+@bot.hybrid_command(name="comingsoon")
+async def comingsoon(ctx):
+    """Show the superstars listed as Coming Soon on the Tier List (row 7)."""
+    wb = workbook
+    if not wb.coming_soon:
+        await ctx.send("📭 Nothing is listed as Coming Soon on the Tier List right now.")
+        return
+    chunks = split_code_aware(format_coming_soon(wb.coming_soon), DESCRIPTION_LIMIT)
+    embeds = [
+        discord.Embed(
+            title="🕒 Coming Soon (Tier List)" + (f" — Part {idx_chunk+1}" if len(chunks) > 1 else ""),
+            description=chunk,
+            color=0xF1C40F,
+        )
+        for idx_chunk, chunk in enumerate(chunks)
+    ]
+    embeds[-1].set_footer(text=f"Tier List — Row 7 only • {len(wb.coming_soon)} superstars")
+    # A roster that outgrows one message (10 embeds) isn't realistic, but don't let Discord reject it
+    for start in range(0, len(embeds), EMBEDS_PER_MESSAGE):
+        await ctx.send(embeds=embeds[start:start + EMBEDS_PER_MESSAGE])
+
+@bot.command(name="sync")
+@commands.is_owner()
+async def sync(ctx):
+    """Register the slash commands with Discord (bot owner only, run after adding or changing them)."""
+    synced = await bot.tree.sync()
+    await ctx.send(f"✅ Synced {len(synced)} slash command(s)")
+
+@bot.command(name="cachestats")
+@commands.is_owner()
+async def cachestats(ctx):
+    """Show lookup cache and coalescing counters (bot owner only)."""
+    stats = lookup_cache.stats()
+    selections = selection_store.stats()
+    pages = page_store.stats()
+    await ctx.send(
+        f"🗃️ Lookup cache: {stats['size']}/{stats['maxsize']} entries • "
+        f"{stats['hits']} hits • {stats['misses']} misses • {stats['evictions']} evictions • "
+        f"{lookup_flights.coalesced} coalesced\n"
+        f"📋 Open selection menus: {selections['size']}/{selections['maxsize']} • "
+        f"{selections['expired']} expired • {selections['evictions']} evicted\n"
+        f"📄 Paged results: {pages['size']}/{pages['maxsize']} • "
+        f"{pages['expired']} expired • {pages['evictions']} evicted"
     )
-    current_size = len(current_embed.title or "") + len(current_embed.description or "")
-    
-    for sheet_name, entries in results_by_sheet.items():
-        for i, entry in enumerate(entries[:10]):
-            # Ensure the current embed color matches this sheet when starting a new embed with no fields
-            if len(current_embed.fields) == 0 and (current_embed.description is not None):
-                # Recreate embed with appropriate color for this sheet
-                current_embed = discord.Embed(
-                    title=current_embed.title,
-                    description=current_embed.description,
-                    color=get_embed_color(sheet_name)
-                )
-                current_size = len(current_embed.title or "") + len(current_embed.description or "")
-            # Split long entries into multiple chunks
-            entry_chunks = split_long_text(entry)
-            
-            for chunk_idx, entry_chunk in enumerate(entry_chunks):
-                if i == 0 and chunk_idx == 0:
-                    field_name = f"📄 {sheet_name}"
-                elif chunk_idx == 0:
-                    field_name = f"📄 {sheet_name} — Continued"
-                else:
-                    field_name = f"📄 {sheet_name} — Part {chunk_idx + 1}"
-                
-                field_size = len(field_name) + len(entry_chunk)
-                if current_size + field_size > 5500:
-                    embeds.append(current_embed)
-                    current_embed = discord.Embed(
-                        title=f"🔍 Search Results: {name.title()} (Continued)",
-                        description="📋 **All matching entries across sheets:**\n⚠️ Note: Results only include superstars with feud builds at 6★ Gold.",
-                        color=get_embed_color(sheet_name)
-                    )
-                    current_size = len(current_embed.title or "") + len(current_embed.description or "")
-                
-                current_embed.add_field(name=field_name, value=entry_chunk, inline=False)
-                current_size += field_size
-    
-    if len(current_embed.fields) > 0:
-        embeds.append(current_embed)
-    
-    for idx, embed in enumerate(embeds):
-        if idx < len(embeds) - 1:
-            embed.set_footer(text=f"📄 Page {idx + 1} of {len(embeds)} • More results below...")
-        else:
-            embed.set_footer(text=f"📄 Page {idx + 1} of {len(embeds)} • End of results")
-        embed.timestamp = discord.utils.utcnow()
-        await ctx.send(embed=embed)
+
+def profiled_lookup(version, name):
+    """The lookup path without the cache: search and render, plus rendering the first pick when it ends at a menu."""
+    result = compute_lookup_result(version, name)
+    if result["page"] is None and result["choices"]:
+        compute_page(version, ["pick", name, result["choices"][0][0]], 1, 0)
+    return result
+
+@bot.command(name="profile")
+@commands.is_owner()
+async def profile(ctx, target: str = "", *, name: str = ""):
+    """Profile a lookup with cProfile and tracemalloc and post the report (bot owner only): !profile lookup <name>"""
+    name = name.strip()
+    if target != "lookup" or not name:
+        await ctx.send("Usage: `!profile lookup <name>`")
+        return
+    if profile_busy():
+        await ctx.send("⏳ Another profile is running, try again in a moment.")
+        return
+    wb = workbook
+    title = f'Lookup "{name}" on workbook {wb.version[:12]} ({len(wb.superstars)} superstar builds)'
+    _, report, stats = await asyncio.to_thread(profile_call, title, profiled_lookup, wb.version, name)
+    path = await asyncio.to_thread(save_report, f"lookup {name}", report, stats)
+    metrics.inc("profiles_total", trigger="command", result="saved")
+    print(f"🔬 Saved profile of lookup {name!r} to {path}")
+    summary = report if len(report) <= 1900 else report[:report.rfind("\n", 0, 1900)] + "\n..."
+    await ctx.send(f"```\n{summary}\n```", file=discord.File(path))
+
+@bot.command(name="reload")
+@commands.is_owner()
+async def reload(ctx):
+    """Re-read the Excel workbook without restarting the bot (bot owner only)."""
+    await ctx.send("📂 Reloading workbook...")
+    if shard_process is not None:
+        # Reloading here would give this process a private copy; the parent reloads and restarts every process
+        os.kill(os.getppid(), signal.SIGHUP)
+        await ctx.send("🔁 The shard processes restart one at a time once it has loaded, check the logs for the result.")
+        return
+    _, message = await reload_workbook(force=True)
+    print(message)
+    await ctx.send(message)
+
+def run_shard_process(process, shard_ids, token):
+    """Body of one forked shard process."""
+    global metrics_file, selection_store, page_store, shard_process
+    shard_process = process
+    bot.shard_ids = shard_ids
+    metrics_file = process_metrics_path(METRICS_FILE, process)
+    # A guild's interactions always reach the process running its shard, so each keeps its own menus
+    selection_store = TTLStore(
+        maxsize=SELECTION_STORE_SIZE, ttl=SELECTION_TTL, path=process_metrics_path(SELECTION_STATE_FILE, process)
+    )
+    selection_store.load()
+    page_store = TTLStore(maxsize=PAGE_STORE_SIZE, ttl=PAGE_TTL, path=process_metrics_path(PAGE_STATE_FILE, process))
+    page_store.load()
+    print(f"🧩 Process {process} (pid {os.getpid()}) running shards {shard_ids}")
+    bot.run(token)
+
+def fork_shard_process(process, shard_ids, token):
+    """Fork one shard process and return its pid."""
+    pid = os.fork()
+    if pid == 0:
+        # Don't inherit the parent's handlers, they manage the other children
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        code = 1
+        try:
+            run_shard_process(process, shard_ids, token)
+            code = 0
+        except Exception:
+            traceback.print_exc()  # os._exit below skips the usual traceback
+        finally:
+            os._exit(code)
+    return pid
+
+def freeze_for_fork():
+    """Move everything loaded so far into the permanent generation, so the garbage
+    collector doesn't write to those objects (and so copy their pages) in every child."""
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+
+def restart_shard_processes(children, token):
+    """Replace the shard processes one at a time, so they all share the workbook the parent just loaded."""
+    freeze_for_fork()
+    for pid, (process, shard_ids) in list(children.items()):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        os.waitpid(pid, 0)
+        del children[pid]
+        children[fork_shard_process(process, shard_ids, token)] = (process, shard_ids)
+        print(f"🔁 Restarted process {process} on workbook {workbook.version[:12]}")
+
+def run_shard_processes(token):
+    """Fork SHARD_PROCESSES processes, each running its share of the shards.
+
+    The workbook is already loaded at this point, so every process starts out sharing the parsed
+    builds and indexes copy-on-write instead of loading its own copy. The parent watches the
+    workbook: a reload in every child would leave each with a private copy, so it reloads once
+    and restarts the children on the new workbook instead.
+    """
+    if not SHARD_COUNT.isdigit():
+        print("❌ SHARD_PROCESSES needs SHARD_COUNT set to a number")
+        exit(1)
+    shard_count = int(SHARD_COUNT)
+    groups = [list(range(process, shard_count, SHARD_PROCESSES)) for process in range(min(SHARD_PROCESSES, shard_count))]
+    for stale in process_metrics_paths(METRICS_FILE):
+        os.remove(stale)  # from an earlier run with a different layout
+
+    freeze_for_fork()
+    children = {
+        fork_shard_process(process, shard_ids, token): (process, shard_ids) for process, shard_ids in enumerate(groups)
+    }
+    reload_requested = False
+
+    def stop_children(signum=None, frame=None):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def request_reload(signum, frame):
+        nonlocal reload_requested
+        reload_requested = True  # sent by !reload in a child
+
+    signal.signal(signal.SIGTERM, stop_children)
+    signal.signal(signal.SIGINT, stop_children)
+    signal.signal(signal.SIGHUP, request_reload)
+    next_check = time.monotonic() + WORKBOOK_WATCH_INTERVAL
+    while True:
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid:
+            break
+        watch_due = WORKBOOK_WATCH_INTERVAL > 0 and time.monotonic() >= next_check
+        if reload_requested or watch_due:
+            force, reload_requested = reload_requested, False
+            next_check = time.monotonic() + WORKBOOK_WATCH_INTERVAL
+            if force or workbook_changed_on_disk():
+                print("📂 Reloading workbook for the shard processes...")
+                reloaded, message = asyncio.run(reload_workbook(force=force))
+                print(message)
+                if reloaded:
+                    restart_shard_processes(children, token)
+        time.sleep(1)
+    # If one shard process dies, stop the rest too so the platform restarts the whole bot
+    print(f"⚠️ Process for shards {children.pop(pid)[1]} exited with status {os.waitstatus_to_exitcode(status)}")
+    stop_children()
+    while children:
+        pid, _ = os.wait()
+        children.pop(pid, None)
+    exit(1)
 
 if __name__ == "__main__":
     token = os.environ.get('DISCORD_BOT_TOKEN')
@@ -587,4 +949,10 @@ if __name__ == "__main__":
         exit(1)
     
     # Run the Discord bot
-    bot.run(token)
+    if SHARD_PROCESSES > 1:
+        run_shard_processes(token)
+    else:
+        if not SHARD_IDS:
+            for stale in process_metrics_paths(METRICS_FILE):
+                os.remove(stale)  # from an earlier sharded run, the web app would keep serving them
+        bot.run(token)
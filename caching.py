@@ -0,0 +1,187 @@
+"""
+Small in-process caches used by the bot
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Bounded least-recently-used cache that counts hits, misses and evictions."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+
+    def items(self):
+        """(key, value) pairs, least recently used first, without counting as hits."""
+        return list(self._data.items())
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class TTLStore:
+    """Bounded key -> value store whose entries expire `ttl` seconds after they were put.
+
+    Holds small state that has to outlive a command, like what an interactive menu refers to.
+    With a path, save()/load() keep it in a JSON file so entries survive a restart; keys must be
+    strings and values JSON-serializable.
+    """
+
+    def __init__(self, maxsize=1000, ttl=900, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self._data = OrderedDict()  # key -> (expires_at, value), oldest first
+        self._save_lock = threading.Lock()  # save() runs in worker threads
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if entry[0] <= time.time():
+            del self._data[key]
+            self.expired += 1
+            return default
+        return entry[1]
+
+    def put(self, key, value):
+        self._data.pop(key, None)
+        self._data[key] = (time.time() + self.ttl, value)
+        self.purge()
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None or entry[0] <= time.time() else entry[1]
+
+    def purge(self):
+        """Drop expired entries. Every entry lives for the same ttl, so they expire oldest first."""
+        now = time.time()
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            del self._data[key]
+            self.expired += 1
+
+    def dump(self):
+        """The live entries as JSON-ready data, for save(). Cheap, so it can run on the event loop."""
+        self.purge()
+        return [[key, expires_at, value] for key, (expires_at, value) in self._data.items()]
+
+    def save(self, data=None):
+        """Write the entries (or a dump() taken earlier) to path, atomically."""
+        if not self.path:
+            return
+        data = self.dump() if data is None else data
+        with self._save_lock:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+
+    def load(self):
+        """Read back what save() wrote, skipping entries that expired meanwhile. Returns how many were loaded."""
+        if not self.path:
+            return 0
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable {self.path}: {e}")
+            return 0
+        now = time.time()
+        for key, expires_at, value in sorted(data, key=lambda entry: entry[1]):
+            if expires_at > now:
+                self._data[key] = (expires_at, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return len(self._data)
+
+    def stats(self):
+        return {"size": len(self._data), "maxsize": self.maxsize, "expired": self.expired, "evictions": self.evictions}
+
+
+class SingleFlight:
+    """Lets concurrent callers asking for the same key share one in-flight computation.
+
+    The first caller starts the work; anyone arriving before it finishes awaits the same task
+    instead of repeating it. Nothing is kept once the task is done, that's the cache's job.
+    """
+
+    def __init__(self):
+        self._inflight = {}  # key -> asyncio.Task
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def __contains__(self, key):
+        return key in self._inflight
+
+    async def run(self, key, func, *args):
+        """Await func(*args), or the identical call already running for key."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        # shield: one caller giving up (e.g. its command being cancelled) must not cancel the others
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark it retrieved even if every caller went away
@@ -0,0 +1,216 @@
+"""
+Packing lookup results into as few Discord messages as possible
+Works on plain embed dicts (the shape discord.Embed.to_dict() produces) so it can run in the
+lookup worker pool and be reused outside the bot.
+"""
+
+# Discord's limits, see https://discord.com/developers/docs/resources/message#embed-object-embed-limits
+EMBEDS_PER_MESSAGE = 10
+MESSAGE_TOTAL_LIMIT = 6000  # title + description + field names/values + footer, summed over every embed
+FIELDS_PER_EMBED = 25
+FIELD_VALUE_LIMIT = 1024
+DESCRIPTION_LIMIT = 4096
+
+# Results rendered a page at a time don't know their page count, only how many movesets they hold
+RANGE_FOOTER = "📄 Page {page} • Movesets {first}–{last} of {total}"
+END_NOTE = "End of results"
+# Room kept free in every message for the page footer added once the page is complete
+FOOTER_RESERVE = len(RANGE_FOOTER.format(page=999, first=9999, last=9999, total=9999))
+
+
+def split_code_aware(text, max_length=FIELD_VALUE_LIMIT):
+    """Split text into chunks of at most max_length characters on line boundaries.
+
+    A ``` code block is kept whole together with the heading line right above it. Only a block
+    that is too big on its own gets split, and then each piece is closed and the next one
+    reopened with the same fence so no chunk ever ends inside a code block.
+    """
+    if len(text) <= max_length:
+        return [text]
+
+    # Group lines into units that should not be separated
+    lines = text.split("\n")
+    units = []
+    i = 0
+    while i < len(lines):
+        if lines[i].startswith("```"):
+            end = i + 1
+            while end < len(lines) and lines[end].strip() != "```":
+                end += 1
+            block = lines[i:end + 1]
+            if units and len(units[-1]) == 1 and units[-1][0].strip() and not units[-1][0].startswith("```"):
+                units[-1].extend(block)  # keep "⚡ **MOVES**" with its block
+            else:
+                units.append(block)
+            i = end + 1
+        else:
+            units.append([lines[i]])
+            i += 1
+
+    chunks = []
+    current = []
+    current_length = -1  # joining n lines adds n - 1 newlines
+
+    def flush():
+        nonlocal current, current_length
+        chunk = "\n".join(current).strip("\n")
+        if chunk:
+            chunks.append(chunk)
+        current = []
+        current_length = -1
+
+    for unit in units:
+        unit_length = sum(len(line) + 1 for line in unit) - 1
+        if current_length + 1 + unit_length <= max_length:
+            current.extend(unit)
+            current_length += 1 + unit_length
+            continue
+        flush()
+        if unit_length <= max_length:
+            current.extend(unit)
+            current_length = unit_length
+            continue
+        # A single unit over the limit: split it line by line, re-fencing code blocks
+        for piece in _split_oversized(unit, max_length):
+            chunks.append(piece)
+    flush()
+    return chunks
+
+
+def _split_oversized(unit, max_length):
+    """Split one unit that is over max_length by itself, closing and reopening its code block."""
+    fence_at = next((idx for idx, line in enumerate(unit) if line.startswith("```")), None)
+    if fence_at is None:
+        current, body, reopen, closing = [], unit, [], []
+    else:
+        current, body = unit[:fence_at + 1], unit[fence_at + 1:]
+        if body and body[-1].strip() == "```":
+            body = body[:-1]
+        reopen, closing = [unit[fence_at]], ["```"]
+
+    pieces = []
+    heading = "\n".join(unit[:fence_at or 0])
+    if len(heading) > max_length // 2:
+        # A long line above the block gets chunks of its own instead of squeezing the block
+        pieces = split_code_aware(heading, max_length)
+        current = list(reopen)
+
+    # Only a single absurdly long line ever gets cut mid-line, to what fits after either prefix a piece starts with
+    room = max_length - max(sum(len(line) + 1 for line in prefix + closing) for prefix in (current, reopen))
+    lines = [line[i:i + room] for line in body for i in range(0, max(len(line), 1), room)]
+
+    has_body = False
+    for line in lines:
+        if has_body and len("\n".join(current + [line] + closing)) > max_length:
+            pieces.append("\n".join(current + closing))
+            current, has_body = list(reopen), False
+        current.append(line)
+        has_body = True
+    pieces.append("\n".join(current + closing))
+    return pieces
+
+
+def embed_length(embed):
+    """Characters an embed dict counts against the per-message total."""
+    return (
+        len(embed.get("title", ""))
+        + len(embed.get("description", ""))
+        + sum(len(field["name"]) + len(field["value"]) for field in embed.get("fields", ()))
+        + len(embed.get("footer", {}).get("text", ""))
+    )
+
+
+def new_embed(title=None, description=None, color=None, footer=None):
+    embed = {"type": "rich"}
+    if title:
+        embed["title"] = title
+    if description:
+        embed["description"] = description
+    if color is not None:
+        embed["color"] = color
+    if footer:
+        embed["footer"] = {"text": footer}
+    return embed
+
+
+def range_footer(page, start, end, total):
+    """Footer for a page holding movesets start..end (end exclusive) of total."""
+    if not total:
+        return f"📄 Page {page} • {END_NOTE}"
+    return RANGE_FOOTER.format(page=page, first=start + 1, last=end, total=total)
+
+
+class MessagePacker:
+    """Lays embeds and embed fields out over as few messages as Discord's limits allow.
+
+    Fields are added in order; a new embed starts whenever the colour changes or an embed is full,
+    and a new message whenever the next field would break the 10-embed or 6000-character limit.
+    The first embed of each message carries the title (the first one also the description).
+    """
+
+    def __init__(self, title, description, continued_title):
+        self.title = title
+        self.description = description
+        self.continued_title = continued_title
+        self.messages = []
+        self._chars = 0
+        self._fields_embed = None  # embed currently receiving fields
+        self._started_results = False
+
+    def _start_message(self):
+        self.messages.append([])
+        self._chars = 0
+        self._fields_embed = None
+
+    def _fits(self, chars, embeds):
+        message = self.messages[-1] if self.messages else None
+        return (
+            message is not None
+            and len(message) + embeds <= EMBEDS_PER_MESSAGE
+            and self._chars + chars <= MESSAGE_TOTAL_LIMIT - FOOTER_RESERVE
+        )
+
+    def add_embed(self, embed):
+        """Add a ready-made embed (e.g. the Tier List one) as-is."""
+        size = embed_length(embed)
+        if not self._fits(size, 1):
+            self._start_message()
+        self.messages[-1].append(embed)
+        self._chars += size
+        self._fields_embed = None
+
+    def _open_fields_embed(self, color):
+        if not self._started_results:
+            title, description = self.title, self.description
+        elif not self.messages[-1]:
+            title, description = self.continued_title, None
+        else:
+            title, description = None, None
+        embed = new_embed(title, description, color)
+        embed["fields"] = []
+        return embed
+
+    def add_field(self, name, value, color):
+        size = len(name) + len(value)
+        embed = self._fields_embed
+        if embed is not None and embed.get("color") == color and len(embed["fields"]) < FIELDS_PER_EMBED:
+            if not self._fits(size, 0):
+                self._start_message()
+                embed = None
+        else:
+            embed = None
+
+        if embed is None:
+            if not self.messages:
+                self._start_message()
+            embed = self._open_fields_embed(color)
+            if not self._fits(embed_length(embed) + size, 1):
+                self._start_message()
+                embed = self._open_fields_embed(color)
+            self.messages[-1].append(embed)
+            self._chars += embed_length(embed)
+            self._fields_embed = embed
+            self._started_results = True
+
+        embed["fields"].append({"name": name, "value": value, "inline": False})
+        self._chars += size
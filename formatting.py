@@ -0,0 +1,153 @@
+"""
+Rendering parsed builds as the text shown in lookup results
+Move colours and video links are worked out once per cell when the workbook is parsed (see
+workbook.parse_moveset), so rendering a moveset is just joining precomputed lines.
+"""
+
+import re
+
+# Explicit colour tokens with an optional number suffix (e.g. BLK, BLU3, R1); the first one wins
+MOVE_TOKEN = re.compile(r"\b(BLK|BLU|G|Y|P|R)[0-9]?\b")
+# Fallback: full colour words or common alt-abbreviations
+COLOR_WORD = re.compile(r"\b(BLACK|BLUE|GREEN|GRN|YELLOW|YLW|PURPLE|PUR|RED)\b")
+
+TOKEN_COLORS = {"BLK": "black", "BLU": "blue", "G": "green", "Y": "yellow", "P": "purple", "R": "red"}
+# In priority order, for moves that mention more than one colour word
+WORD_COLORS = (
+    (("BLACK",), "black"),
+    (("BLUE",), "blue"),
+    (("GREEN", "GRN"), "green"),
+    (("YELLOW", "YLW"), "yellow"),
+    (("PURPLE", "PUR"), "purple"),
+    (("RED",), "red"),
+)
+COLOR_EMOJIS = {"black": "⚫", "blue": "🔵", "green": "🟢", "yellow": "🟡", "purple": "🟣", "red": "🔴"}
+DEFAULT_MOVE_EMOJI = "⚡"
+
+# Moveset field -> heading and code block language (None: plain lines, no code block), in display order.
+# move_lines and video_lines are precomputed at parse time, the rest are bulleted here.
+SECTIONS = (
+    ("move_lines", "⚡ **MOVES**", "diff"),
+    ("trainers", "💪 **TRAINERS**", "yaml"),
+    ("coaches", "👑 **COACHES**", "yaml"),
+    ("skill_plates", "⭐ **SKILL PLATES**", "yaml"),
+    ("ultimate_plates", "✨ **ULTIMATE PLATES**", "yaml"),
+    ("gear", "🎒 **GEAR & MOMENTS**", "yaml"),
+    ("tag_links", "🤝 **TAG LINKS**", "yaml"),
+    ("entourage", "👥 **ENTOURAGE**", "yaml"),
+    ("notes", "📝 **NOTES**", ""),
+    ("video_lines", "🎬 **GAMEPLAY VIDEOS**", None),
+)
+PRECOMPUTED_FIELDS = ("move_lines", "video_lines")
+
+
+def move_color(move):
+    """Colour of a move cell ("black", "blue", ...) from its colour token or else a colour word; None if it has neither."""
+    text = move.upper()
+    m = MOVE_TOKEN.search(text)
+    if m:
+        return TOKEN_COLORS[m.group(1)]
+    words = set(COLOR_WORD.findall(text))
+    for names, color in WORD_COLORS:
+        if words.intersection(names):
+            return color
+    return None
+
+
+def move_color_emoji(move):
+    return COLOR_EMOJIS.get(move_color(move), DEFAULT_MOVE_EMOJI)
+
+
+def move_line(move):
+    return f"+ {move_color_emoji(move)} {move}"
+
+
+def video_url(video):
+    """Full URL for a video cell, adding https:// where it was left off; None if it doesn't look like a URL."""
+    video = video.strip()
+    if video.startswith(("http://", "https://")):
+        return video
+    if video.startswith("www."):
+        return f"https://{video}"
+    lower = video.lower()
+    if "youtube.com" in lower or "youtu.be" in lower:
+        # YouTube link without protocol
+        return video if video.startswith("http") else f"https://{video}"
+    return None
+
+
+def video_line(video):
+    """Make a video cell clickable as a Discord hyperlink when it looks like a URL."""
+    url = video_url(video)
+    if url:
+        return f"🔗 [Watch Video]({url})"
+    # Not a recognizable URL format - display as-is
+    return f"🔗 {video.strip()}"
+
+
+def display_header(superstar):
+    header = " | ".join(superstar.name_fields)
+    if superstar.coming_soon:
+        header = f"{header} — Coming Soon" if header else "Coming Soon"
+    return f"{header} Tier Feud Poster" if header else header
+
+
+def format_moveset(moveset, moveset_number, header):
+    parts = [f"🎯 **MOVESET #{moveset_number}**", f"**{header}**\n"]
+    for field, heading, language in SECTIONS:
+        values = getattr(moveset, field)
+        if not values:
+            continue
+        parts.append(heading)
+        if language is None:
+            parts.extend(values)
+            parts.append("")  # Empty line for spacing
+        else:
+            parts.append(f"```{language}")
+            if field in PRECOMPUTED_FIELDS:
+                parts.extend(values)
+            else:
+                parts.extend(f"• {value}" for value in values)
+            parts.append("```\n")
+    return "\n".join(parts)
+
+
+def format_superstar(superstar):
+    """Format each moveset of a superstar in a beautiful modern format."""
+    header = display_header(superstar)
+    return [format_moveset(moveset, number, header) for number, moveset in enumerate(superstar.movesets, 1)]
+
+
+def format_coming_soon(names):
+    return "\n".join(f"• {name}" for name in names)
+
+
+def moveset_data(moveset, moveset_number, header):
+    """Plain-JSON view of a moveset for the web API, with the same text !lookup shows under "text"."""
+    data = {
+        "number": moveset_number,
+        "moves": [{"name": move, "color": move_color(move)} for move in moveset.moves],
+    }
+    for field, _, _ in SECTIONS:
+        if field not in PRECOMPUTED_FIELDS:
+            data[field] = list(getattr(moveset, field))
+    data["videos"] = [{"text": video, "url": video_url(video)} for video in moveset.videos]
+    data["text"] = format_moveset(moveset, moveset_number, header)
+    return data
+
+
+def superstar_data(superstar, with_movesets=True):
+    """Plain-JSON view of a superstar for the web API."""
+    data = {
+        "name": superstar.full_name,
+        "name_fields": list(superstar.name_fields),
+        "sheet": superstar.sheet,
+        "coming_soon": superstar.coming_soon,
+        "moveset_count": len(superstar.movesets),
+    }
+    if with_movesets:
+        header = display_header(superstar)
+        data["movesets"] = [
+            moveset_data(moveset, number, header) for number, moveset in enumerate(superstar.movesets, 1)
+        ]
+    return data
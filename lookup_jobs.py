@@ -0,0 +1,353 @@
+"""
+The lookup pool's jobs: searching the workbook and rendering result pages
+Everything here takes and returns plain data (a workbook version instead of the Workbook), so it
+runs the same in a thread or in a worker process. Importing this module has no side effects, which
+is what lets LOOKUP_EXECUTOR=process workers import it instead of the bot.
+"""
+
+import multiprocessing
+import time
+import weakref
+
+from embed_packing import DESCRIPTION_LIMIT, FIELD_VALUE_LIMIT, MessagePacker, new_embed, range_footer, split_code_aware
+from formatting import display_header, format_coming_soon, format_moveset
+from search_index import normalize
+from workbook import EXCEL_FILE, load_workbook, parse_query
+
+FUZZY_SUGGESTIONS = 5  # "did you mean" options offered when a name isn't found
+BATCH_MATCHES_PER_NAME = 3  # a batch name matching more superstars than this is reported instead of shown
+SELECTION_OPTIONS = 25  # most options Discord allows in a select menu
+
+# Workbooks still referenced by a lookup (or the live one), by version. The bot registers every
+# workbook it loads; a worker process only has the one it loaded itself.
+loaded_workbooks = weakref.WeakValueDictionary()
+_worker_workbook = None  # keeps a worker process's workbook alive between jobs
+
+
+class WorkbookChanged(Exception):
+    """Raised when a job asks for a workbook version that is no longer loaded and not on disk either."""
+
+
+def workbook_for(version):
+    """The workbook snapshot for a version.
+
+    In the bot process that's the live workbook or one pinned by an in-flight lookup; once nothing
+    pins a version it is gone for good. Worker processes only have what they loaded, so they load
+    the file again when a job asks for a version they don't have, which only helps if that is the
+    version on disk now.
+    """
+    global _worker_workbook
+    wb = loaded_workbooks.get(version)
+    if wb is not None:
+        return wb
+    if multiprocessing.parent_process() is None:
+        raise WorkbookChanged(version)
+    wb = _worker_workbook = load_workbook(EXCEL_FILE)
+    loaded_workbooks[wb.version] = wb
+    if wb.version != version:
+        raise WorkbookChanged(version)
+    return wb
+
+
+def timed_call(func, *args):
+    """func(*args) plus how long it ran, measured in the worker so queueing isn't counted."""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+# Color mapping for different sheets to make embeds more colorful
+def get_embed_color(sheet_name: str) -> int:
+    s = sheet_name.lower()
+    if "strikers" in s:
+        return 0x000000  # black
+    if "acros" in s or "acro" in s:
+        return 0x3498DB  # blue
+    if "tech" in s:
+        return 0x2ECC71  # green
+    if "trick" in s:
+        return 0x9B59B6  # purple
+    if "phs" in s or "powerhouse" in s:
+        return 0xE74C3C  # red
+    if "sbs" in s or "showboat" in s:
+        return 0xF1C40F  # yellow
+    if "tier list" in s:
+        return 0xF1C40F  # gold
+    return 0x5865F2  # default blurple
+
+
+def coming_soon_entries(wb):
+    return [f"**Coming Soon (Tier List Row 7)**\n{format_coming_soon(wb.coming_soon)}"]
+
+
+def group_by_name(wb, positions):
+    """Positions of builds grouped by full superstar name (Wrestler | Era | Class), for the selection menu."""
+    choices = {}
+    for position in positions:
+        superstar = wb.superstars[position]
+        if superstar.movesets:
+            choices.setdefault(superstar.full_name, []).append(position)
+    return choices
+
+
+def find_superstars(wb, name, timings=None):
+    """Search the parsed workbook for a wrestler name (excluding Trainer/Coach columns) and any class:/era:/... filters.
+
+    Returns (tier_list_entries, choices, suggested) where choices maps each full superstar name to
+    the positions of its builds in wb.superstars. Nothing is formatted yet. When nothing matches,
+    choices holds the closest names instead and suggested is True.
+    Pass a dict as timings to get the search/suggest durations in seconds.
+    """
+    started = time.perf_counter()
+    tier_list_entries = []
+
+    # Special handling for 'Tier List': only row 7 counts, its roster is parsed once per workbook version
+    if wb.coming_soon and wb.tier_list_matches(name):
+        tier_list_entries = coming_soon_entries(wb)
+
+    # The index only hands back superstars that actually match
+    choices = group_by_name(wb, wb.search_positions(name))
+    searched = time.perf_counter()
+    if timings is not None:
+        timings["search"] = searched - started
+
+    # Nothing at all? Probably a typo, offer the closest names for the selection menu
+    suggested = False
+    if not choices and not tier_list_entries:
+        choices = group_by_name(wb, wb.suggest_positions(name, limit=FUZZY_SUGGESTIONS))
+        suggested = bool(choices)
+        if timings is not None:
+            timings["suggest"] = time.perf_counter() - searched
+
+    return tier_list_entries, choices, suggested
+
+
+def result_header(name):
+    """(title, description, continued title) of a lookup's result pages."""
+    return (
+        f"🔍 Search Results: {name.title()}",
+        "📋 **All matching entries across sheets:**\n⚠️ Note: Results only include superstars with feud builds at 6★ Gold.",
+        f"🔍 Search Results: {name.title()} (Continued)",
+    )
+
+
+def filter_header(query, count):
+    """(title, description, continued title) of the result pages of a filtered query."""
+    name, filters = parse_query(query)
+    described = " • ".join([f"**{facet}:** {value}" for facet, value in filters] + ([f"**name:** {name}"] if name else []))
+    return (
+        "🔍 Filter Results",
+        f"📋 **{count} superstars match** {described}\n⚠️ Note: Results only include superstars with feud builds at 6★ Gold.",
+        "🔍 Filter Results (Continued)",
+    )
+
+
+def moveset_units(wb, positions):
+    """(position, moveset index) of every moveset to show, each sheet's together in the order the sheets first appear.
+
+    Only counts movesets, so it's cheap enough to redo for every page instead of storing.
+    """
+    by_sheet = {}
+    for position in positions:
+        superstar = wb.superstars[position]
+        by_sheet.setdefault(superstar.sheet, []).extend((position, index) for index in range(len(superstar.movesets)))
+    return [unit for units in by_sheet.values() for unit in units]
+
+
+def add_tier_list_embeds(packer, tier_list_entries):
+    tier_chunks = split_code_aware("\n\n".join(tier_list_entries), DESCRIPTION_LIMIT)
+    for idx_chunk, chunk in enumerate(tier_chunks):
+        packer.add_embed(new_embed(
+            title="🕒 Coming Soon (Tier List)" + (f" — Part {idx_chunk+1}" if len(tier_chunks) > 1 else ""),
+            description=chunk,
+            color=0xF1C40F,
+            footer="Tier List — Row 7 only",
+        ))
+
+
+def add_moveset_fields(packer, entries, previous_sheet=None):
+    """One field per formatted moveset (or part of one), coloured by sheet; entries are (sheet, text) pairs."""
+    for sheet_name, entry in entries:
+        color = get_embed_color(sheet_name)
+        # Long entries are split between sections, never inside a code block
+        entry_chunks = split_code_aware(entry, FIELD_VALUE_LIMIT)
+        for chunk_idx, entry_chunk in enumerate(entry_chunks):
+            if sheet_name != previous_sheet and chunk_idx == 0:
+                field_name = f"📄 {sheet_name}"
+            elif chunk_idx == 0:
+                field_name = f"📄 {sheet_name} — Continued"
+            else:
+                field_name = f"📄 {sheet_name} — Part {chunk_idx + 1}"
+            packer.add_field(field_name, entry_chunk, color)
+        previous_sheet = sheet_name
+
+
+def new_page_packer(header, page, tier_list_entries):
+    title, description, continued_title = header
+    if page == 1:
+        packer = MessagePacker(title=title, description=description, continued_title=continued_title)
+    else:
+        packer = MessagePacker(title=continued_title, description=None, continued_title=continued_title)
+    if tier_list_entries:
+        add_tier_list_embeds(packer, tier_list_entries)
+    return packer
+
+
+def render_page(wb, header, positions, tier_list, page, start):
+    """Format and pack one page of results: the movesets from start on that fit in one message.
+
+    Only this page's movesets are formatted (plus the one that didn't fit), so later pages cost
+    nothing until someone asks for them. Page 1 also carries the Coming Soon roster when tier_list
+    is set. Returns (page, timings), page being {"number", "embeds", "start", "end", "total"} with
+    end the first moveset of the next page.
+    """
+    started = time.perf_counter()
+    units = moveset_units(wb, positions)
+    tier_list_entries = coming_soon_entries(wb) if tier_list and page == 1 else []
+    packer = new_page_packer(header, page, tier_list_entries)
+    entries = []
+    format_seconds = 0.0
+    end = start
+    while end < len(units):
+        format_started = time.perf_counter()
+        position, index = units[end]
+        superstar = wb.superstars[position]
+        entry = (superstar.sheet, format_moveset(superstar.movesets[index], index + 1, display_header(superstar)))
+        format_seconds += time.perf_counter() - format_started
+        add_moveset_fields(packer, [entry], entries[-1][0] if entries else None)
+        if len(packer.messages) > 1:
+            # Spilled into a second message: this moveset starts the next page instead. A page always
+            # shows at least one, and a moveset too big for a message by itself is cut to what fits.
+            if entries or tier_list_entries:
+                packer = new_page_packer(header, page, tier_list_entries)
+                add_moveset_fields(packer, entries)
+            else:
+                end += 1
+            break
+        entries.append(entry)
+        end += 1
+
+    if not packer.messages:
+        # Nothing to show (a batch that found no builds), so the title and summary get an embed of their own
+        title, description = (header[0], header[1]) if page == 1 else (header[2], None)
+        packer.add_embed(new_embed(title=title, description=description))
+    embeds = packer.messages[0]
+    embeds[-1]["footer"] = {"text": range_footer(page, start, end, len(units))}
+    rendered = {"number": page, "embeds": embeds, "start": start, "end": end, "total": len(units)}
+    return rendered, {"format": format_seconds, "pack": time.perf_counter() - started - format_seconds}
+
+
+def lookup_pages(wb, name, choices):
+    """(header, positions) of a lookup shown as pages straight away: the one superstar it found, or every match of a filter."""
+    filtered = bool(parse_query(name)[1])
+    header = filter_header(name, len(choices)) if filtered else result_header(name)
+    return header, sorted(position for positions in choices.values() for position in positions)
+
+
+def resolve_pages(wb, source):
+    """(header, positions, tier list flag) of a paged result, worked out again from its source.
+
+    A source is ["lookup", query], ["pick", query, full name] or ["batch", *names]: what the bot keeps
+    for a result's Previous/Next buttons instead of the positions of every build it shows.
+    """
+    kind, query = source[0], source[1]
+    if kind == "batch":
+        return search_batch(wb, source[1:])
+    tier_list_entries, choices, suggested = find_superstars(wb, query)
+    if kind == "pick":
+        full_name = source[2]
+        # A suggestion replaces the misspelled query in the title
+        header = result_header(full_name.split(" | ")[0] if suggested else query)
+        return header, choices.get(full_name, []), bool(tier_list_entries)
+    header, positions = lookup_pages(wb, query, choices)
+    return header, positions, bool(tier_list_entries)
+
+
+def compute_page(version, source, page, start):
+    """One page of the result source describes (see resolve_pages), for the lookup pool."""
+    wb = workbook_for(version)
+    return render_page(wb, *resolve_pages(wb, source), page, start)
+
+
+def compute_lookup_result(version, name):
+    """Search a query, and render the first page when it found a single superstar. Runs in the lookup pool,
+    so it only takes and returns plain data.
+
+    Stage timings ride along in result["timings"] so they can be recorded even from a worker process.
+    """
+    timings = {}
+    wb = workbook_for(version)
+    tier_list_entries, choices, suggested = find_superstars(wb, name, timings)
+    result = {
+        "tier_list_entries": tier_list_entries,
+        # (full name, positions) pairs for the selection menu; nothing is rendered until one is picked
+        "choices": list(choices.items())[:SELECTION_OPTIONS],
+        "choice_count": len(choices),
+        "suggested": suggested,
+        # The first page, when the builds are shown straight away instead of a menu
+        "page": None,
+        "timings": timings,
+    }
+    filtered = bool(parse_query(name)[1])
+    if (filtered and choices) or (len(choices) <= 1 and not suggested and (choices or tier_list_entries)):
+        # A filter asks for every match ("all Technicians from the Attitude era"), paged rather than picked from
+        header, positions = lookup_pages(wb, name, choices)
+        result["page"], render_timings = render_page(wb, header, positions, bool(tier_list_entries), 1, 0)
+        timings.update(render_timings)
+    return result
+
+
+def parse_batch_names(text):
+    """Names from a comma or newline separated list, without blanks or repeats, in the order given."""
+    names = {}
+    for part in text.replace("\n", ",").split(","):
+        name = part.strip()
+        if name:
+            names.setdefault(normalize(name), name)
+    return list(names.values())
+
+
+def search_batch(wb, names):
+    """(header, positions, tier list flag) of a batch: every build its names found, each superstar once.
+
+    Names that match nothing or too many superstars are listed in the description instead.
+    """
+    positions = set()
+    tier_list = False
+    notes = []
+    for name in names:
+        choices = group_by_name(wb, wb.search_positions(name))
+        tier_list = tier_list or (bool(wb.coming_soon) and wb.tier_list_matches(name))
+        if len(choices) > BATCH_MATCHES_PER_NAME:
+            notes.append(f"🔀 **{name}** matches {len(choices)} superstars, use `!lookup` or the full name")
+        elif choices:
+            for name_positions in choices.values():
+                positions.update(name_positions)
+        elif not wb.tier_list_matches(name):
+            suggestions = [wb.superstars[position].full_name for position in wb.suggest_positions(name, limit=1)]
+            hint = f", did you mean **{suggestions[0]}**?" if suggestions else ""
+            notes.append(f"❌ **{name}** not found{hint}")
+
+    # Sheet order, so each sheet's builds sit together whatever order the names came in
+    positions = sorted(positions)
+    found = len(names) - len(notes)
+    description = f"📋 **Found {found} of {len(names)} names** ({len(positions)} builds)"
+    if notes:
+        description += "\n" + "\n".join(notes)
+    header = ("🔍 Batch Lookup", description[:DESCRIPTION_LIMIT], "🔍 Batch Lookup (Continued)")
+    return header, positions, tier_list
+
+
+def compute_batch_result(version, names):
+    """Resolve every name of a batch in one job and render the first page of all the builds found.
+
+    The Tier List roster is only shown once too. Runs in the lookup pool; returns a dict with the
+    first page and the stage timings.
+    """
+    started = time.perf_counter()
+    wb = workbook_for(version)
+    header, positions, tier_list = search_batch(wb, names)
+    searched = time.perf_counter()
+    page, timings = render_page(wb, header, positions, tier_list, 1, 0)
+    timings["search"] = searched - started
+    return {"page": page, "timings": timings}
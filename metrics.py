@@ -0,0 +1,189 @@
+"""
+Lightweight metrics shared between the bot and the web app
+The bot records counters, gauges and latency histograms in-process and periodically writes a
+JSON snapshot to METRICS_FILE. web_app.py reads that file to serve /metrics (Prometheus text
+format) and /health, so the two processes don't need anything beyond a shared directory.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_FILE = os.environ.get("METRICS_FILE", "bot_metrics.json")
+METRICS_INTERVAL = float(os.environ.get("METRICS_INTERVAL", "15"))  # seconds between snapshots, 0 disables
+METRIC_PREFIX = "champions_bot_"
+# Seconds; covers an index hit (sub-ms) up to a rate-limited Discord send
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Metrics:
+    """Counters, gauges and histograms keyed by name plus labels. Safe to use from worker threads."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> value
+        self._gauges = {}      # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts..., count, sum]
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += 1
+            histogram[-1] += seconds
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self):
+        """Plain-JSON view of every metric."""
+        with self._lock:
+            return {
+                "generated_at": time.time(),
+                "buckets": list(self.buckets),
+                "counters": [[name, dict(labels), value] for (name, labels), value in self._counters.items()],
+                "gauges": [[name, dict(labels), value] for (name, labels), value in self._gauges.items()],
+                "histograms": [[name, dict(labels), list(values)] for (name, labels), values in self._histograms.items()],
+            }
+
+    def write(self, path=METRICS_FILE, extra=None):
+        """Atomically write the snapshot (plus any extra status fields) for the web app to pick up."""
+        data = self.snapshot()
+        data["status"] = extra or {}
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+
+def process_metrics_path(path, process):
+    """Where one process of a sharded bot writes its snapshot, e.g. bot_metrics.shard0.json."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{process}{ext}"
+
+
+def process_metrics_paths(path=METRICS_FILE):
+    root, ext = os.path.splitext(path)
+    return sorted(glob.glob(f"{glob.escape(root)}.shard*{ext}"))
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_snapshot(path=METRICS_FILE):
+    """The last snapshot the bot wrote, or None if there isn't one yet.
+
+    A sharded bot writes one file per process; those are merged into one snapshot with a
+    process label on every metric, and each process's status under status["processes"].
+    If both layouts are on disk (the bot was switched between sharded and unsharded), the
+    one written most recently wins.
+    """
+    single = _read_json(path)
+    parts = process_metrics_paths(path)
+    if not parts:
+        return single
+
+    merged = None
+    newest = 0
+    for part in parts:
+        snapshot = _read_json(part)
+        if snapshot is None:
+            continue
+        process = os.path.splitext(part)[0].rsplit(".shard", 1)[1]
+        if merged is None:
+            merged = {
+                "generated_at": snapshot["generated_at"],
+                "buckets": snapshot.get("buckets", []),
+                "counters": [],
+                "gauges": [],
+                "histograms": [],
+                # Workbook fields are the same in every process, take them from the first
+                "status": dict(snapshot.get("status", {}), processes={}),
+            }
+        # The oldest process decides staleness, so one stuck shard shows up on /health
+        merged["generated_at"] = min(merged["generated_at"], snapshot["generated_at"])
+        newest = max(newest, snapshot["generated_at"])
+        for kind in ("counters", "gauges", "histograms"):
+            merged[kind].extend(
+                [name, dict(labels, process=process), value] for name, labels, value in snapshot.get(kind, [])
+            )
+        merged["status"]["processes"][process] = snapshot.get("status", {})
+    if single is not None and (merged is None or single["generated_at"] > newest):
+        return single
+    return merged
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def render_prometheus(snapshot):
+    """Prometheus text exposition format for a snapshot produced by Metrics.snapshot()."""
+    lines = []
+    typed = set()
+
+    def declare(name, kind):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+
+    for name, labels, value in sorted(snapshot.get("counters", []), key=lambda metric: metric[0]):
+        full_name = METRIC_PREFIX + name
+        declare(full_name, "counter")
+        lines.append(f"{full_name}{_format_labels(labels)} {value}")
+    for name, labels, value in sorted(snapshot.get("gauges", []), key=lambda metric: metric[0]):
+        full_name = METRIC_PREFIX + name
+        declare(full_name, "gauge")
+        lines.append(f"{full_name}{_format_labels(labels)} {value}")
+    buckets = snapshot.get("buckets", [])
+    for name, labels, values in sorted(snapshot.get("histograms", []), key=lambda metric: metric[0]):
+        full_name = METRIC_PREFIX + name
+        declare(full_name, "histogram")
+        for bound, count in zip(buckets, values):
+            lines.append(f"{full_name}_bucket{_format_labels(labels, {'le': bound})} {count}")
+        lines.append(f"{full_name}_bucket{_format_labels(labels, {'le': '+Inf'})} {values[-2]}")
+        lines.append(f"{full_name}_count{_format_labels(labels)} {values[-2]}")
+        lines.append(f"{full_name}_sum{_format_labels(labels)} {values[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
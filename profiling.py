@@ -0,0 +1,95 @@
+"""
+On-demand profiling of the lookup path
+Runs a function under cProfile and tracemalloc and turns what they saw into a short text report:
+the functions with the most cumulative time and the lines holding the most newly allocated memory.
+Reports are saved to PROFILE_DIR (with the raw .prof for snakeviz/pstats) so profiles captured
+automatically for slow lookups can be read later.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_TOP = 15  # functions and allocation sites listed in a report
+
+# tracemalloc is process-wide, so only one profile runs at a time
+_profile_lock = threading.Lock()
+
+
+def busy():
+    return _profile_lock.locked()
+
+
+def _allocation_sites(before, after, limit):
+    ignored = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen *>"))
+    stats = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), "lineno")
+    lines = []
+    for stat in [stat for stat in stats if stat.size_diff > 0][:limit]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{os.path.basename(frame.filename)}:{frame.lineno}: "
+            f"+{stat.size_diff / 1024:.1f} KiB in {stat.count_diff:+d} blocks"
+        )
+    return lines
+
+
+def profile_call(title, func, *args):
+    """Run func(*args) under cProfile and tracemalloc. Returns (result, report text, pstats.Stats).
+
+    Only the calling thread is profiled; allocations are process-wide, so other work running at the
+    same time can show up among the allocation sites.
+    """
+    with _profile_lock:
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            result = profiler.runcall(func, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if not was_tracing:
+                tracemalloc.stop()
+
+    text = io.StringIO()
+    stats = pstats.Stats(profiler, stream=text)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(PROFILE_TOP)
+    functions = text.getvalue().strip("\n")
+    # Drop pstats' preamble (call totals and ordering), keeping the table
+    functions = functions[functions.find("ncalls"):] if "ncalls" in functions else functions
+
+    report = "\n".join([
+        f"🔬 {title}",
+        f"Wall time {elapsed * 1000:.1f} ms under the profiler, peak traced memory {peak / (1 << 20):.2f} MiB",
+        "",
+        f"Top {PROFILE_TOP} functions by cumulative time:",
+        functions,
+        "",
+        f"Top {PROFILE_TOP} allocation sites (memory still held at the end):",
+        *(_allocation_sites(before, after, PROFILE_TOP) or ["(none)"]),
+    ])
+    return result, report, stats
+
+
+def save_report(label, report, stats):
+    """Write report (.txt) and the raw profile (.prof) to PROFILE_DIR. Returns the .txt path."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    slug = re.sub(r"[^a-z0-9]+", "-", label.lower()).strip("-")[:40] or "profile"
+    base = os.path.join(PROFILE_DIR, f"{stamp}-{os.getpid()}-{slug}")
+    with open(f"{base}.txt", "w") as f:
+        f.write(report + "\n")
+    stats.dump_stats(f"{base}.prof")
+    return f"{base}.txt"
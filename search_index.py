@@ -0,0 +1,216 @@
+"""
+In-memory search index for !lookup
+Built once when the workbook is loaded so a query only touches the blocks that can match,
+instead of copying and scanning every cell of every sheet.
+"""
+
+from bisect import bisect_left
+
+GRAM_SIZE = 3
+
+
+def normalize(text):
+    """Lowercase and collapse whitespace so index keys and queries compare the same way."""
+    return " ".join(str(text).lower().split())
+
+
+def _grams(text):
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class SearchIndex:
+    """Substring index over documents (one per build block) using trigram posting lists."""
+
+    def __init__(self):
+        self._texts = {}     # key -> normalized searchable text (cells joined by newlines)
+        self._postings = {}  # trigram -> set of keys
+        self._order = {}     # key -> insertion position, so results keep sheet/row order
+
+    def __len__(self):
+        return len(self._texts)
+
+    def add(self, key, cells):
+        """Index a document made of several cell values. Cells never match across each other."""
+        text = "\n".join(normalize(c) for c in cells if c)
+        self._texts[key] = text
+        self._order[key] = len(self._order)
+        for cell in text.split("\n"):
+            for gram in _grams(cell):
+                self._postings.setdefault(gram, set()).add(key)
+
+    def carry_over(self, previous, remap):
+        """Copy documents from another index under new keys (remap: old key -> new key), reusing their
+        trigrams instead of working them out again. Documents missing from remap are left out.
+
+        Call set_order once every document is in, since carried documents don't take an insertion slot.
+        """
+        for old_key, new_key in remap.items():
+            self._texts[new_key] = previous._texts[old_key]
+        for gram, keys in previous._postings.items():
+            carried = {remap[key] for key in keys if key in remap}
+            if carried:
+                self._postings.setdefault(gram, set()).update(carried)
+
+    def set_order(self, keys):
+        """Return search results in the order of keys from now on."""
+        self._order = {key: position for position, key in enumerate(keys)}
+
+    def search(self, query):
+        """Return the keys of every document containing the query as a substring (case-insensitive)."""
+        query = normalize(query)
+        if not query:
+            return []
+
+        if len(query) < GRAM_SIZE:
+            # Too short for trigrams: fall back to checking each document's text
+            candidates = self._texts.keys()
+        else:
+            postings = []
+            for gram in _grams(query):
+                keys = self._postings.get(gram)
+                if not keys:
+                    return []
+                postings.append(keys)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for keys in postings[1:]:
+                candidates &= keys
+                if not candidates:
+                    return []
+
+        # Trigrams only narrow things down; confirm the real substring match
+        matches = [key for key in candidates if query in self._texts[key]]
+        matches.sort(key=self._order.__getitem__)
+        return matches
+
+
+class FacetIndex:
+    """Posting lists for structured filters: facet ("class", "era", ...) -> column value -> set of keys.
+
+    A facet only has a handful of distinct values (classes, eras, sheets) up to a few hundred
+    (trainers), so a filter scans those values rather than the documents, however many there are.
+    """
+
+    def __init__(self):
+        self._postings = {}  # facet -> {normalized value: set of keys}
+        self._labels = {}    # facet -> {normalized value: the value as first seen}
+
+    def add(self, key, facet_values):
+        """Index a document under (facet, value) pairs."""
+        for facet, value in facet_values:
+            if value:
+                normalized = normalize(value)
+                self._postings.setdefault(facet, {}).setdefault(normalized, set()).add(key)
+                self._labels.setdefault(facet, {}).setdefault(normalized, value)
+
+    def values(self, facet):
+        """Every value of a facet, as written in the workbook, in alphabetical order."""
+        labels = self._labels.get(facet, {})
+        return [labels[value] for value in sorted(labels)]
+
+    def match(self, filters):
+        """Keys matching every (facet, value) filter, where a value matches any column value containing it."""
+        postings = []
+        for facet, value in filters:
+            value = normalize(value)
+            keys = set()
+            for column_value, column_keys in self._postings.get(facet, {}).items():
+                if value in column_value:
+                    keys |= column_keys
+            if not keys:
+                return set()
+            postings.append(keys)
+        postings.sort(key=len)
+        matched = set(postings[0]) if postings else set()
+        for keys in postings[1:]:
+            matched &= keys
+            if not matched:
+                break
+        return matched
+
+
+def _padded_grams(text):
+    # Padding lets the start and end of a name count, which matters most for short names
+    padded = f"  {text} "
+    return {padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+class FuzzyIndex:
+    """Trigram similarity index for "did you mean" suggestions when a name is misspelled."""
+
+    def __init__(self):
+        self._postings = {}  # trigram -> list of entry ids
+        self._entries = []   # entry id -> (key, number of trigrams)
+
+    def add(self, key, text):
+        """Add one spelling (full name, a single word of it, ...) that should lead to key."""
+        grams = _padded_grams(normalize(text))
+        entry_id = len(self._entries)
+        self._entries.append((key, len(grams)))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(entry_id)
+
+    def carry_over(self, previous, remap):
+        """Copy spellings from another index under new keys (remap: old key -> new key); others are left out."""
+        entry_ids = {}
+        for entry_id, (key, size) in enumerate(previous._entries):
+            if key in remap:
+                entry_ids[entry_id] = len(self._entries)
+                self._entries.append((remap[key], size))
+        for gram, ids in previous._postings.items():
+            carried = [entry_ids[entry_id] for entry_id in ids if entry_id in entry_ids]
+            if carried:
+                self._postings.setdefault(gram, []).extend(carried)
+
+    def suggest(self, query, limit=5, min_score=0.35):
+        """Return up to `limit` keys ranked by trigram (Dice) similarity to the query, best first."""
+        grams = _padded_grams(normalize(query))
+        shared = {}
+        for gram in grams:
+            for entry_id in self._postings.get(gram, ()):
+                shared[entry_id] = shared.get(entry_id, 0) + 1
+
+        best = {}
+        for entry_id, count in shared.items():
+            key, size = self._entries[entry_id]
+            score = 2 * count / (len(grams) + size)
+            if score >= min_score and score > best.get(key, 0):
+                best[key] = score
+        return sorted(best, key=lambda key: (-best[key], key))[:limit]
+
+
+class PrefixIndex:
+    """Sorted array of names for prefix completion. Each name is also reachable from the start of any of its words."""
+
+    def __init__(self, names=()):
+        entries = set()
+        for name in names:
+            key = normalize(name)
+            start = 0
+            while start != -1:
+                if key[start:start + 1].isalnum():  # skip the " | " separators
+                    entries.add((key[start:], name))
+                start = key.find(" ", start)
+                if start != -1:
+                    start += 1
+        self._entries = sorted(entries)
+        self._keys = [key for key, _ in self._entries]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def complete(self, prefix, limit=25):
+        """Up to `limit` distinct names with a word starting with prefix, in alphabetical order of the match."""
+        prefix = normalize(prefix)
+        results = []
+        seen = set()
+        for i in range(bisect_left(self._keys, prefix), len(self._keys)):
+            if not self._keys[i].startswith(prefix):
+                break
+            name = self._entries[i][1]
+            if name not in seen:
+                seen.add(name)
+                results.append(name)
+                if len(results) == limit:
+                    break
+        return results
@@ -1,12 +1,100 @@
 """
 PythonAnywhere Web App file
-This file is used by PythonAnywhere's web app feature to serve the health check endpoints
+This file is used by PythonAnywhere's web app feature to serve the health check endpoints,
+plus a JSON lookup API that runs on the same parsed workbook, index and formatting as !lookup
 """
 
-from flask import Flask
+import gzip
+import json
+import os
+import threading
+import time
+
+from flask import Flask, Response, request
+
+from caching import LRUCache
+from formatting import superstar_data
+from metrics import METRICS_INTERVAL, read_snapshot, render_prometheus
+from search_index import normalize
+from workbook import EXCEL_FILE, load_workbook
 
 app = Flask(__name__)
 
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+API_CACHE_SIZE = int(os.environ.get("API_CACHE_SIZE", "256"))
+API_MAX_AGE = int(os.environ.get("API_MAX_AGE", "60"))  # seconds browsers and CDNs may reuse a response
+API_DEFAULT_RESULTS = 25
+API_MAX_RESULTS = 100
+API_SUGGESTIONS = 5
+GZIP_MIN_BYTES = 512  # smaller bodies aren't worth compressing
+WORKBOOK_CHECK_INTERVAL = 5.0  # seconds between checks of the workbook file for changes
+
+_workbook = None
+_workbook_mtime = None
+_workbook_checked = 0.0
+_workbook_lock = threading.Lock()
+# (endpoint, params..., workbook version) -> (JSON bytes, gzipped bytes or None)
+api_cache = LRUCache(maxsize=API_CACHE_SIZE)
+_api_cache_lock = threading.Lock()  # Flask serves requests from several threads
+
+def current_workbook():
+    """The parsed workbook and its file mtime, reloaded when the file changes.
+
+    Loading goes through the same snapshot the bot writes, so this is usually a few milliseconds.
+    Raises OSError if the workbook has never been loadable.
+    """
+    global _workbook, _workbook_mtime, _workbook_checked
+    with _workbook_lock:
+        now = time.monotonic()
+        if _workbook is not None and now - _workbook_checked < WORKBOOK_CHECK_INTERVAL:
+            return _workbook, _workbook_mtime
+        _workbook_checked = now
+        try:
+            mtime = os.path.getmtime(EXCEL_FILE)
+            if _workbook is None or mtime != _workbook_mtime:
+                wb = load_workbook(EXCEL_FILE, previous=_workbook)
+                if wb.sheet_names:
+                    _workbook, _workbook_mtime = wb, mtime
+        except OSError:
+            if _workbook is None:
+                raise
+            # Mid-replace or briefly missing: keep serving what we have
+        if _workbook is None:
+            raise OSError(f"no sheets could be read from {EXCEL_FILE}")
+        return _workbook, _workbook_mtime
+
+def api_response(cache_key, build):
+    """JSON response for build(workbook), cached per workbook version, gzipped when the client accepts it
+    and answered with 304 Not Modified when the client's ETag/Last-Modified are still current."""
+    try:
+        wb, mtime = current_workbook()
+    except OSError as e:
+        return {"error": f"workbook not available: {e}"}, 503
+
+    cache_key = cache_key + (wb.version,)
+    with _api_cache_lock:
+        cached = api_cache.get(cache_key)
+    if cached is None:
+        body = json.dumps(build(wb), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        cached = (body, gzip.compress(body) if len(body) >= GZIP_MIN_BYTES else None)
+        with _api_cache_lock:
+            api_cache.put(cache_key, cached)
+
+    body, gzipped = cached
+    response = Response(mimetype="application/json")
+    if gzipped is not None and request.accept_encodings["gzip"]:
+        response.set_data(gzipped)
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response.set_data(body)
+    response.vary.add("Accept-Encoding")
+    # Weak: the gzipped and plain bodies are the same data
+    response.set_etag(wb.version, weak=True)
+    response.last_modified = mtime
+    response.cache_control.public = True
+    response.cache_control.max_age = API_MAX_AGE
+    return response.make_conditional(request)
+
 @app.route('/')
 def home():
     return "✅ Discord Bot is running!<br><br>Use /ping to check status"
@@ -17,10 +105,66 @@ def ping():
 
 @app.route('/health')
 def health():
-    return {"status": "ok", "service": "discord-bot"}, 200
+    body = {"status": "ok", "service": "discord-bot"}
+    snapshot = read_snapshot()
+    if snapshot is None:
+        # The bot hasn't written metrics yet (or runs on another machine)
+        body["bot"] = None
+        return body, 200
 
-# PythonAnywhere will use this app object
-# Note: The Discord bot itself runs separately via an Always-on Task or in a Bash console
+    age = time.time() - snapshot["generated_at"]
+    body["bot"] = snapshot.get("status", {})
+    body["metrics_age_seconds"] = round(age, 1)
+    if METRICS_INTERVAL > 0 and age > 3 * METRICS_INTERVAL:
+        body["status"] = "stale"
+    return body, 200
+
+@app.route('/comingsoon')
+def coming_soon():
+    """Tier List "Coming Soon" roster as JSON, read from the workbook like /api/superstars."""
+    def build(wb):
+        return {"coming_soon": list(wb.coming_soon), "workbook_version": wb.version}
+    return api_response(("comingsoon",), build)
 
+@app.route('/metrics')
+def prometheus_metrics():
+    snapshot = read_snapshot()
+    if snapshot is None:
+        return "# no metrics written by the bot yet\n", 503, {"Content-Type": PROMETHEUS_CONTENT_TYPE}
+    return render_prometheus(snapshot), 200, {"Content-Type": PROMETHEUS_CONTENT_TYPE}
 
+@app.route('/api/superstars')
+def api_superstars():
+    """Every superstar build in the workbook (names only, no movesets)."""
+    def build(wb):
+        return {
+            "version": wb.version,
+            "count": len(wb.superstars),
+            "superstars": [superstar_data(superstar, with_movesets=False) for superstar in wb.superstars],
+            "coming_soon": list(wb.coming_soon),
+        }
+    return api_response(("superstars",), build)
 
+@app.route('/api/lookup')
+def api_lookup():
+    """The same search as !lookup, as structured JSON. ?q=<name>&limit=<max results>"""
+    query = request.args.get("q", "").strip()
+    if not query:
+        return {"error": "missing q parameter"}, 400
+    limit = max(1, min(request.args.get("limit", API_DEFAULT_RESULTS, type=int), API_MAX_RESULTS))
+
+    def build(wb):
+        matches = wb.search(query)
+        return {
+            "query": query,
+            "version": wb.version,
+            "total": len(matches),
+            "results": [superstar_data(superstar) for superstar in matches[:limit]],
+            # Nothing found: probably a typo, same "did you mean" names as !lookup
+            "suggestions": [] if matches else [superstar.full_name for superstar in wb.suggest(query, limit=API_SUGGESTIONS)],
+            "coming_soon": list(wb.coming_soon) if wb.tier_list_matches(query) else [],
+        }
+    return api_response(("lookup", normalize(query), limit), build)
+
+# PythonAnywhere will use this app object
+# Note: The Discord bot itself runs separately via an Always-on Task or in a Bash console
@@ -0,0 +1,619 @@
+"""
+Workbook loading and the parsed build model
+Every class sheet is parsed once into small immutable Superstar/Moveset records, so lookups
+and formatting run over plain Python objects instead of DataFrame rows.
+"""
+
+import hashlib
+import mmap
+import os
+import pickle
+import re
+import sys
+import time
+from dataclasses import dataclass
+
+from openpyxl import load_workbook as open_xlsx
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import formatting
+from formatting import move_line, video_line
+from search_index import FacetIndex, FuzzyIndex, PrefixIndex, SearchIndex, normalize
+
+EXCEL_FILE = os.environ.get("EXCEL_FILE", "Copy of Twilight BATs' WWE Champions Tier List.xlsx")
+EXCLUDED_COLUMN_NAMES = ["Trainer 1", "Trainer 2", "Coach 1", "Coach 2"]
+TIER_LIST_SHEET = "tier list"
+TIER_LIST_ROW = 6  # Row 7 in Excel holds the "Coming Soon" roster
+TIER_LIST_MARKERS = ("coming soon", "brought to you by")  # intro/marketing cells in that row, not names
+MOVESET_ROWS = 3
+NAME_FIELD_COUNT = 3  # Wrestler | Era | Class
+MOVE_COLUMN = 3
+
+# Moveset field -> sheet headers feeding it, in display order
+SECTION_HEADERS = {
+    "trainers": ("Trainer 1", "Trainer 2"),
+    "coaches": ("Coach 1", "Coach 2"),
+    "skill_plates": ("Skill Plates",),
+    "ultimate_plates": ("Ultimate Plates",),
+    "gear": ("Gear & Moments",),
+    "tag_links": ("Tag Links",),
+    "entourage": ("Entourage Ability",),
+    "notes": ("Notes",),
+    "videos": ("Gameplay Videos",),
+}
+KNOWN_HEADERS = {header for headers in SECTION_HEADERS.values() for header in headers}
+UNSEARCHED_FIELDS = ("trainers", "coaches")
+
+# Filters a query can carry, e.g. "class:tech era:attitude trainer:rock"; values with spaces go in quotes
+FACETS = ("class", "era", "sheet", "trainer", "coach")
+FILTER_PATTERN = re.compile(r'(?<!\S)(' + "|".join(FACETS) + r')\s*:\s*(?:["“”]([^"“”]*)["“”]|(\S+))', re.IGNORECASE)
+
+# Parsed workbooks are cached on disk next to the .xlsx so a restart can skip openpyxl entirely
+SNAPSHOT_ENABLED = os.environ.get("WORKBOOK_SNAPSHOT", "1") != "0"
+SNAPSHOT_MAGIC = b"TSFSNAP"
+# Bump whenever Workbook/Superstar/Moveset/SearchIndex change shape. Changes to formatting.py don't
+# need a bump: the header also carries a hash of it (see _snapshot_header)
+SNAPSHOT_FORMAT = 8
+
+# "pandas" reads each sheet into a DataFrame; "stream" reads rows straight from openpyxl's
+# read-only mode and keeps only the columns lookups use, for small-memory hosts
+WORKBOOK_LOADER = os.environ.get("WORKBOOK_LOADER", "pandas")
+COMING_SOON_COLUMNS = 5  # "Coming soon" markers are looked for in the first 5 cells of each row
+
+
+@dataclass(frozen=True, slots=True)
+class Moveset:
+    moves: tuple
+    trainers: tuple = ()
+    coaches: tuple = ()
+    skill_plates: tuple = ()
+    ultimate_plates: tuple = ()
+    gear: tuple = ()
+    tag_links: tuple = ()
+    entourage: tuple = ()
+    notes: tuple = ()
+    videos: tuple = ()
+    extra: tuple = ()  # (header, values) for columns that are searched but not displayed
+    # Display lines worked out once at load: "+ <colour> move" and clickable video links
+    move_lines: tuple = ()
+    video_lines: tuple = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Superstar:
+    sheet: str
+    name_fields: tuple  # the filled-in Wrestler | Era | Class cells
+    movesets: tuple
+    coming_soon: bool = False
+
+    @property
+    def full_name(self):
+        return " | ".join(self.name_fields) if self.name_fields else "Unknown"
+
+    def spellings(self):
+        """Names a user might type for this superstar, for typo-tolerant suggestions."""
+        if not self.name_fields:
+            return
+        wrestler = self.name_fields[0]
+        yield wrestler
+        yield self.full_name
+        # Single words too, so "Ripely" still finds "Rhea Ripley"
+        words = wrestler.split()
+        if len(words) > 1:
+            yield from (word for word in words if len(word) >= 4)
+
+    def search_cells(self):
+        """Cells !lookup matches against (everything except the Trainer/Coach columns)."""
+        yield from self.name_fields
+        for moveset in self.movesets:
+            yield from moveset.moves
+            for field in SECTION_HEADERS:
+                if field not in UNSEARCHED_FIELDS:
+                    yield from getattr(moveset, field)
+            for _, values in moveset.extra:
+                yield from values
+
+    def facet_values(self):
+        """(facet, value) pairs filters match against: the Era and Class cells, the sheet and the Trainer/Coach columns."""
+        if len(self.name_fields) == NAME_FIELD_COUNT:
+            # Only a fully filled-in name says which cell is the era and which the class
+            yield "era", self.name_fields[1]
+            yield "class", self.name_fields[2]
+        yield "sheet", self.sheet
+        for moveset in self.movesets:
+            yield from (("trainer", trainer) for trainer in moveset.trainers)
+            yield from (("coach", coach) for coach in moveset.coaches)
+
+
+def parse_query(query):
+    """Split a lookup query into its name part and its filters.
+
+    "class:tech era:attitude rock" -> ("rock", [("class", "tech"), ("era", "attitude")])
+    """
+    filters = [(facet.lower(), quoted or word) for facet, quoted, word in FILTER_PATTERN.findall(query)]
+    return " ".join(FILTER_PATTERN.sub(" ", query).split()), [(facet, value) for facet, value in filters if value.strip()]
+
+
+class Workbook:
+    """Parsed contents of the workbook plus the lookup index built over it.
+
+    fingerprints holds a content hash of each superstar's block of rows (see block_fingerprint). Given
+    the previously loaded workbook, blocks whose fingerprint didn't change keep their index entries
+    instead of being indexed again.
+    """
+
+    def __init__(self, superstars, sheet_names, tier_list_row=(), version="", row_count=0, fingerprints=(), previous=None):
+        self.version = version  # content hash of the source file; changes whenever the workbook does
+        self.row_count = row_count
+        self.load_seconds = 0.0  # how long the last load took, and whether it came from "xlsx" or "snapshot"
+        self.loaded_from = "xlsx"
+        self.superstars = tuple(superstars)
+        self.fingerprints = tuple(fingerprints)
+        self.sheet_names = tuple(sheet_names)
+        self.tier_list_row = tuple(tier_list_row)
+        self.coming_soon = parse_coming_soon(self.tier_list_row)
+        self._tier_list_text = "\n".join(normalize(cell) for cell in self.tier_list_row if cell)
+        self.index = SearchIndex()
+        self.fuzzy = FuzzyIndex()
+        self.full_names = {}  # normalized "Wrestler | Era | Class" -> positions
+        # Rebuilt on every load rather than carried over: it's a few set inserts per superstar, no trigrams
+        self.facets = FacetIndex()
+        carried = self.unchanged_positions(previous) if previous is not None else {}
+        if carried:
+            self.index.carry_over(previous.index, carried)
+            self.fuzzy.carry_over(previous.fuzzy, carried)
+        indexed = set(carried.values())
+        for position, superstar in enumerate(self.superstars):
+            if position not in indexed:
+                self.index.add(position, superstar.search_cells())
+                for spelling in superstar.spellings():
+                    self.fuzzy.add(position, spelling)
+            self.full_names.setdefault(normalize(superstar.full_name), []).append(position)
+            self.facets.add(position, superstar.facet_values())
+        if carried:
+            self.index.set_order(range(len(self.superstars)))
+        self.names = PrefixIndex(superstar.full_name for superstar in self.superstars if superstar.name_fields)
+
+    def search_positions(self, query):
+        """Positions in self.superstars of every superstar with a searchable cell containing the query, in sheet order.
+
+        A full "Wrestler | Era | Class" name (what autocomplete fills in) returns just that superstar.
+        Filters in the query (see parse_query) keep only the superstars matching all of them; a query
+        of filters alone returns everything they match.
+        """
+        name, filters = parse_query(query)
+        if filters:
+            return self.filter_positions(filters, name)
+        positions = self.full_names.get(normalize(query))
+        if positions is None:
+            positions = self.index.search(query)
+        return positions
+
+    def filter_positions(self, filters, name=""):
+        """Positions of the superstars matching every (facet, value) filter and the name, if any, in sheet order."""
+        matched = self.facets.match(filters)
+        if not name:
+            return sorted(matched)
+        return [position for position in self.search_positions(name) if position in matched]
+
+    def search(self, query):
+        """Like search_positions, but the Superstar records."""
+        return [self.superstars[position] for position in self.search_positions(query)]
+
+    def tier_list_matches(self, query):
+        """Whether any Tier List row 7 cell contains the query (which surfaces the Coming Soon roster).
+
+        Never for a filtered query: the roster has no class, era or trainers to filter on.
+        """
+        if parse_query(query)[1]:
+            return False
+        query = normalize(query)
+        return bool(query) and query in self._tier_list_text
+
+    def complete(self, prefix, limit=25):
+        """Full superstar names for autocomplete."""
+        return self.names.complete(prefix, limit=limit)
+
+    def suggest_positions(self, query, limit=5):
+        """Positions of the closest superstars by name for a query that found nothing, best first.
+
+        Empty for a filtered query, where "nothing" means nothing passed the filters rather than a typo.
+        """
+        if parse_query(query)[1]:
+            return []
+        return self.fuzzy.suggest(query, limit=limit)
+
+    def suggest(self, query, limit=5):
+        return [self.superstars[position] for position in self.suggest_positions(query, limit=limit)]
+
+    def reusable_blocks(self):
+        """Fingerprint -> superstars parsed from blocks with that content, for parsing a newer version."""
+        blocks = {}
+        for fingerprint, superstar in zip(self.fingerprints, self.superstars):
+            blocks.setdefault(fingerprint, []).append(superstar)
+        return blocks
+
+    def unchanged_positions(self, previous):
+        """Position in previous -> position here of every superstar whose block is unchanged."""
+        old_positions = {}
+        for position, fingerprint in enumerate(previous.fingerprints):
+            old_positions.setdefault(fingerprint, []).append(position)
+        positions = {}
+        for position, fingerprint in enumerate(self.fingerprints):
+            candidates = old_positions.get(fingerprint)
+            if candidates:
+                positions[candidates.pop(0)] = position
+        return positions
+
+    def diff(self, previous):
+        """Superstars added, changed and removed since previous, as {"added": [...], ...} of "Name (Sheet)" labels.
+
+        A superstar is identified by its sheet and full name; several builds under one name pair up in order.
+        """
+        def by_name(wb):
+            names = {}
+            for fingerprint, superstar in zip(wb.fingerprints, wb.superstars):
+                names.setdefault((superstar.sheet, superstar.full_name), []).append(fingerprint)
+            return names
+
+        old_names, new_names = by_name(previous), by_name(self)
+        changes = {"added": [], "changed": [], "removed": []}
+        for key in old_names.keys() | new_names.keys():
+            old, new = old_names.get(key, []), new_names.get(key, [])
+            label = f"{key[1]} ({key[0]})"
+            changes["changed"].extend(label for a, b in zip(old, new) if a != b)
+            changes["added"].extend([label] * (len(new) - len(old)))
+            changes["removed"].extend([label] * (len(old) - len(new)))
+        for labels in changes.values():
+            labels.sort()
+        return changes
+
+
+def cell_text(val):
+    """Stripped, interned cell text; '' for blanks (NaN from pandas, None from openpyxl, for empty and merged-away cells)."""
+    if val is None:
+        return ''
+    val_str = str(val).strip()
+    if not val_str or val_str.lower() == 'nan':
+        return ''
+    return sys.intern(val_str)
+
+
+def parse_coming_soon(tier_list_row):
+    """Superstar names from Tier List row 7: comma-split, marker cells skipped, de-duplicated case-insensitively."""
+    names = []
+    seen = set()
+    for val in tier_list_row:
+        if not val or val.lower().startswith(TIER_LIST_MARKERS):
+            continue
+        # Split on commas to handle multiple names in one cell
+        for part in val.split(','):
+            part = part.strip()
+            key = normalize(part)
+            if key and key not in seen:
+                seen.add(key)
+                names.append(sys.intern(part))
+    return tuple(names)
+
+
+def file_fingerprint(path):
+    """Hex digest of the file contents, used as the workbook version."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_wrestler_name_column(header_row):
+    """Try to identify the wrestler name column (usually column A or B after Era)."""
+    headers = [str(header) for header in header_row]
+    for idx, header in enumerate(headers):
+        if header.lower() in ['era', 'wrestler', 'name']:
+            if header.lower() == 'era' and idx + 1 < len(headers):
+                return idx + 1
+            return idx
+    return 0
+
+
+def is_excluded_header(header):
+    return any(excluded_name.lower() in header.lower() for excluded_name in EXCLUDED_COLUMN_NAMES)
+
+
+def parse_moveset(rows, headers):
+    """Build one Moveset from its (up to) 3 sheet rows."""
+    moves = []
+    for row in rows:
+        if len(row) > MOVE_COLUMN:
+            move = cell_text(row[MOVE_COLUMN])
+            if move:
+                moves.append(move)
+
+    other_info = {}
+    for row in rows:
+        for j in range(MOVE_COLUMN + 1, min(len(row), len(headers))):
+            header = headers[j]
+            val = cell_text(row[j])
+            if val and header:
+                values = other_info.setdefault(header, [])
+                if val not in values:
+                    values.append(val)
+
+    sections = {
+        field: tuple(val for header in field_headers for val in other_info.get(header, ()))
+        for field, field_headers in SECTION_HEADERS.items()
+    }
+    extra = tuple(
+        (header, tuple(values)) for header, values in other_info.items()
+        if header not in KNOWN_HEADERS and not is_excluded_header(header)
+    )
+    return Moveset(
+        moves=tuple(moves),
+        extra=extra,
+        move_lines=tuple(move_line(move) for move in moves),
+        video_lines=tuple(video_line(video) for video in sections["videos"]),
+        **sections,
+    )
+
+
+def block_fingerprint(sheet_digest, block):
+    """Content hash of one superstar's rows. sheet_digest covers the sheet name and header row, which
+    parsing depends on too."""
+    digest = sheet_digest.copy()
+    for row in block:
+        cells = [cell_text(val) for val in row]
+        while cells and not cells[-1]:
+            cells.pop()
+        digest.update("\x1f".join(cells).encode("utf-8", "surrogatepass"))
+        digest.update(b"\x1e")
+    return digest.digest()
+
+
+def parse_block(sheet_name, block, headers):
+    """One superstar from its block of rows: the named row plus the blank-name rows under it."""
+    first_row = block[0]
+    name_fields = tuple(
+        val for val in (cell_text(first_row[j]) for j in range(min(NAME_FIELD_COUNT, len(first_row)))) if val
+    )
+    coming_soon = any(
+        cell_text(row[j]).lower().startswith("coming soon")
+        for row in block for j in range(min(COMING_SOON_COLUMNS, len(row)))
+    )
+    movesets = tuple(
+        parse_moveset(block[i:i + MOVESET_ROWS], headers) for i in range(0, len(block), MOVESET_ROWS)
+    )
+    return Superstar(sheet_name, name_fields, movesets, coming_soon)
+
+
+def parse_sheet(sheet_name, rows, reuse=None):
+    """Turn a class sheet into (fingerprint, Superstar) pairs.
+
+    rows is any iterable of row tuples, header row first, so a sheet can be parsed as it streams in.
+    Each superstar is a row with a name plus the blank-name rows merged under it, and every 3 rows
+    of that block are one moveset. Blocks whose fingerprint is in reuse (Workbook.reusable_blocks()
+    of the previous version) take the already parsed Superstar instead of being parsed again.
+    """
+    rows = iter(rows)
+    header_row = next(rows, None)
+    if header_row is None:
+        return []
+
+    headers = [cell_text(h) for h in header_row]
+    name_col_idx = get_wrestler_name_column(header_row)
+    sheet_name = sys.intern(sheet_name)
+    sheet_digest = hashlib.blake2b(digest_size=16)
+    sheet_digest.update("\x1f".join([sheet_name] + headers).encode("utf-8", "surrogatepass"))
+
+    def finish(block):
+        fingerprint = block_fingerprint(sheet_digest, block)
+        reusable = reuse.get(fingerprint) if reuse else None
+        if reusable:
+            return fingerprint, reusable.pop(0)
+        return fingerprint, parse_block(sheet_name, block, headers)
+
+    superstars = []
+    block = None
+    for row in rows:
+        if block is None or cell_text(row[name_col_idx]):
+            if block:
+                superstars.append(finish(block))
+            block = []
+        block.append(row)
+    if block:
+        superstars.append(finish(block))
+    return superstars
+
+
+def snapshot_path(path):
+    return f"{path}.snapshot"
+
+
+def _snapshot_header(version):
+    # Snapshots hold text rendered at load (Moveset.move_lines, video_lines), so an edit to
+    # formatting.py has to invalidate them just like a new workbook version does
+    with open(formatting.__file__, "rb") as f:
+        formatting_digest = hashlib.sha256(f.read()).digest()[:8]
+    return SNAPSHOT_MAGIC + SNAPSHOT_FORMAT.to_bytes(2, "little") + formatting_digest + version.encode("ascii")
+
+
+def read_snapshot(path, version):
+    """Load the Workbook snapshot saved next to `path`, or None if it is missing or from another file version."""
+    header = _snapshot_header(version)
+    try:
+        with open(snapshot_path(path), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(header)] != header:
+                    return None
+                # Unpickle straight out of the mapping instead of reading the file into a bytes copy
+                with memoryview(mm) as view, view[len(header):] as payload:
+                    wb = pickle.loads(payload)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+        print(f"⚠️ Ignoring unreadable workbook snapshot: {e}")
+        return None
+    return wb if isinstance(wb, Workbook) and wb.version == version else None
+
+
+def write_snapshot(path, wb):
+    """Save the parsed workbook next to `path`. Written to a temp file first so readers never see half a snapshot."""
+    target = snapshot_path(path)
+    tmp = f"{target}.{os.getpid()}.tmp"  # per process: shard processes may write at the same time
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_snapshot_header(wb.version))
+            pickle.dump(wb, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+    except OSError as e:
+        print(f"⚠️ Could not write workbook snapshot: {e}")
+
+
+def peak_rss_mib():
+    """Highest resident memory this process has reached, in MiB (None where the OS doesn't say)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def format_peak_rss():
+    peak = peak_rss_mib()
+    return "peak RSS unknown" if peak is None else f"peak RSS {peak:.1f} MiB"
+
+
+def load_workbook(path, use_snapshot=SNAPSHOT_ENABLED, loader=None, previous=None):
+    """Load the workbook, from its snapshot when it matches the file on disk, otherwise by parsing the xlsx.
+
+    loader picks how the xlsx is parsed, "pandas" or "stream" (default: WORKBOOK_LOADER). previous is
+    the currently loaded Workbook, if any: superstar blocks that didn't change are taken from it
+    instead of being parsed and indexed again.
+    """
+    loader = loader or WORKBOOK_LOADER
+    started = time.perf_counter()
+    version = file_fingerprint(path)
+    if use_snapshot:
+        wb = read_snapshot(path, version)
+        if wb is not None:
+            wb.load_seconds = time.perf_counter() - started
+            wb.loaded_from = "snapshot"
+            print(f"⚡ Loaded workbook snapshot in {wb.load_seconds * 1000:.0f} ms ({format_peak_rss()})")
+            return wb
+
+    wb = stream_workbook(path, version, previous) if loader == "stream" else parse_workbook(path, version, previous)
+    wb.load_seconds = time.perf_counter() - started
+    print(f"✅ Parsed workbook with the {loader} loader in {wb.load_seconds * 1000:.0f} ms ({format_peak_rss()})")
+    if previous is not None:
+        reused = len(wb.unchanged_positions(previous))
+        print(f"♻️ Reused {reused} of {len(wb.superstars)} superstar blocks from the previous version")
+    if use_snapshot and wb.sheet_names:
+        write_snapshot(path, wb)
+    return wb
+
+
+def parse_workbook(path, version, previous=None):
+    """Read every sheet, parse it and let the DataFrame go. Returns a Workbook."""
+    import pandas as pd  # imported here so the stream loader never pays for it (tens of MiB)
+
+    reuse = previous.reusable_blocks() if previous is not None else None
+    blocks = []
+    sheet_names = []
+    tier_list_row = ()
+    row_count = 0
+    with pd.ExcelFile(path) as xls:
+        for sheet_name in xls.sheet_names:
+            try:
+                df = pd.read_excel(xls, sheet_name=sheet_name, header=None)
+                if sheet_name.lower() == TIER_LIST_SHEET:
+                    if len(df) > TIER_LIST_ROW:
+                        tier_list_row = tuple(cell_text(val) for val in df.iloc[TIER_LIST_ROW].tolist())
+                else:
+                    blocks.extend(parse_sheet(sheet_name, df.itertuples(index=False, name=None), reuse))
+                sheet_names.append(sheet_name)
+                row_count += df.shape[0]
+                print(f"✅ Loaded sheet: {sheet_name} ({df.shape[0]} rows, {df.shape[1]} columns)")
+                del df
+            except Exception as e:
+                print(f"⚠️ Could not read sheet '{sheet_name}': {e}")
+    fingerprints = [fingerprint for fingerprint, _ in blocks]
+    superstars = [superstar for _, superstar in blocks]
+    return Workbook(superstars, sheet_names, tier_list_row, version, row_count, fingerprints, previous)
+
+
+def used_columns(header_row):
+    """Indexes of the columns parsing actually reads: the name/Era/Class and Moves columns (plus the few
+    checked for "Coming soon") and every later column whose header is displayed or searched."""
+    leading = max(COMING_SOON_COLUMNS, MOVE_COLUMN + 1, get_wrestler_name_column(header_row) + 1)
+    # A sheet narrower than that just has fewer columns, the same as pandas sees it
+    columns = list(range(min(leading, len(header_row))))
+    for j in range(leading, len(header_row)):
+        header = cell_text(header_row[j])
+        if header and (header in KNOWN_HEADERS or not is_excluded_header(header)):
+            columns.append(j)
+    return columns
+
+
+def stream_rows(rows, counter):
+    """Rows from openpyxl's read-only mode cut down to the columns parsing uses, header row first.
+
+    Only one row is held at a time. Empty rows are passed on only if a non-empty row follows, the
+    same way pandas drops trailing empty rows, so both loaders group movesets identically.
+    """
+    rows = iter(rows)
+    header_row = next(rows, None)
+    if header_row is None:
+        return
+    counter[0] += 1
+    columns = used_columns(header_row)
+    width = len(header_row)
+    yield tuple(header_row[j] for j in columns)
+
+    pending_empty = 0
+    for row in rows:
+        if all(val is None for val in row):
+            pending_empty += 1
+            continue
+        counter[0] += pending_empty + 1
+        empty = (None,) * len(columns)
+        for _ in range(pending_empty):
+            yield empty
+        pending_empty = 0
+        if len(row) < width:
+            row = row + (None,) * (width - len(row))
+        yield tuple(row[j] for j in columns)
+
+
+def stream_workbook(path, version, previous=None):
+    """parse_workbook without pandas: rows stream out of openpyxl's read-only mode and are parsed
+    as they arrive, so no sheet is ever held in memory as a whole. Returns a Workbook."""
+    reuse = previous.reusable_blocks() if previous is not None else None
+    blocks = []
+    sheet_names = []
+    tier_list_row = ()
+    row_count = 0
+    xlsx = open_xlsx(path, read_only=True, data_only=True)
+    try:
+        for ws in xlsx.worksheets:
+            sheet_name = ws.title
+            try:
+                counter = [0]
+                if sheet_name.lower() == TIER_LIST_SHEET:
+                    for i, row in enumerate(ws.iter_rows(values_only=True)):
+                        counter[0] += 1
+                        if i == TIER_LIST_ROW:
+                            tier_list_row = tuple(cell_text(val) for val in row)
+                else:
+                    blocks.extend(parse_sheet(sheet_name, stream_rows(ws.iter_rows(values_only=True), counter), reuse))
+                sheet_names.append(sheet_name)
+                row_count += counter[0]
+                print(f"✅ Loaded sheet: {sheet_name} ({counter[0]} rows)")
+            except Exception as e:
+                print(f"⚠️ Could not read sheet '{sheet_name}': {e}")
+    finally:
+        xlsx.close()
+    fingerprints = [fingerprint for fingerprint, _ in blocks]
+    superstars = [superstar for _, superstar in blocks]
+    return Workbook(superstars, sheet_names, tier_list_row, version, row_count, fingerprints, previous)